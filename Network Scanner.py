@@ -1,34 +1,699 @@
-import subprocess
+import argparse
+import asyncio
+import bisect
+import csv
+import errno
+import ipaddress
+import json
+import math
+import os
+import re
+import shutil
+import socket
+import sqlite3
+import sys
+import time
+from functools import partial
+from itertools import chain
 
-print("Network Scanner starting...\n")
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
-subnet = input("Enter your subnet(example: 192.168.1. or 192.168.29.): ").strip()
+CONCURRENCY = 128
+PING_TIMEOUT = 1.0
+# Ports for the TCP-connect liveness probe: a refused connection proves the
+# host is up just as well as an accepted one.
+PROBE_PORTS = (80, 443, 22, 445)
 
-print("Scanning...This may take some time!\n")
-active_hosts = 0
-inactive_hosts = 0
+RTT_RE = re.compile(rb"time[=<]\s*([\d.]+)\s*ms")
 
-active_list = []
-inactive_list = []
+PORT_CONCURRENCY = 1000
+PORT_TIMEOUT = 0.5
+PORT_RATE = 5000
+BANNER_TIMEOUT = 1.0
+BANNER_BYTES = 256
+FINGERPRINT_TTL = 7 * 24 * 3600
+STATE_DB = os.getenv("SCANNER_STATE_DB", "scanner_state.sqlite3")
+HTTP_PORTS = {80, 81, 591, 3000, 5000, 8000, 8008, 8080, 8081, 8888}
+MIN_TIMEOUT = 0.05
+# Head start for the ping process itself before its deadline counts.
+PING_GRACE = 0.05
+# Upper bounds (ms) of the latency histogram buckets; the last one is open.
+LATENCY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+RECORD_FIELDS = ("type", "ip", "port", "alive", "rtt_ms", "change", "service", "banner", "ts")
 
-for i in range(1,256):
-    ip = subnet + str(i)
 
-    result = subprocess.run(["ping", "-n", "1", "-w", "300", ip],
-                        stdout= subprocess.DEVNULL,
-                        stderr=subprocess.PIPE
-    )
-    if result.returncode == 0:
-        print(ip , " is Active")
-        active_hosts += 1
-        active_list.append(ip)
+class ProbeUnavailable(RuntimeError):
+    """The probe cannot run at all (e.g. no ping binary): stop the scan
+    rather than report every host as down."""
+
+
+def out_of_fds(e):
+    return e.errno in (errno.EMFILE, errno.ENFILE)
+
+
+class ScanMetrics:
+    """Live counters for a sweep: probes in flight, completed, answered,
+    timed out (no answer after the probe's full timeout) and failed (the
+    probe itself raised), a sliding-window
+    probes/s rate and a latency histogram of answered probes. Everything
+    is a fixed-size counter, so memory is the same for a /30 and a /8."""
+
+    def __init__(self, window=5.0):
+        self.started = time.monotonic()
+        self.window = window
+        self.in_flight = self.done = self.answered = self.timeouts = self.errors = 0
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self._marks = [(self.started, 0)]
+
+    def begin(self):
+        self.in_flight += 1
+
+    def end(self, elapsed, answered, timeout, error=False):
+        self.in_flight -= 1
+        self.done += 1
+        if error:
+            self.errors += 1
+        elif answered:
+            self.answered += 1
+            self.histogram[bisect.bisect_left(LATENCY_BUCKETS, elapsed * 1000)] += 1
+        elif elapsed >= timeout * 0.95:
+            self.timeouts += 1
+
+    def rate(self):
+        now = time.monotonic()
+        self._marks.append((now, self.done))
+        while len(self._marks) > 2 and now - self._marks[1][0] >= self.window:
+            self._marks.pop(0)
+        t, n = self._marks[0]
+        return (self.done - n) / (now - t) if now > t else 0.0
+
+    def snapshot(self):
+        labels = [f"<={b}ms" for b in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}ms"]
+        return {"elapsed_s": round(time.monotonic() - self.started, 3), "in_flight": self.in_flight,
+                "probes": self.done, "answered": self.answered, "timeouts": self.timeouts, "errors": self.errors,
+                "probes_per_s": round(self.rate(), 1), "latency_ms": dict(zip(labels, self.histogram))}
+
+
+async def report_metrics(metrics, interval, path=None, stream=sys.stderr):
+    """Every ``interval`` seconds print a status line and, with ``path``,
+    atomically rewrite a JSON snapshot for dashboards to poll."""
+    while True:
+        await asyncio.sleep(interval)
+        snap = metrics.snapshot()
+        if path:
+            tmp = f"{path}.tmp{os.getpid()}"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(snap, f)
+            os.replace(tmp, path)
+        if stream:
+            stream.write(f"[{snap['elapsed_s']:7.1f}s] {snap['probes']:,} probes  {snap['probes_per_s']:,.0f}/s  "
+                         f"{snap['in_flight']} in flight  {snap['answered']:,} answered  "
+                         f"{snap['timeouts']:,} timeouts  {snap['errors']:,} errors\n")
+            stream.flush()
+
+
+class RecordWriter:
+    """Streams one record per finished host or open port as NDJSON or CSV
+    (columns: RECORD_FIELDS), flushing each line so consumers can tail it."""
+
+    def __init__(self, stream, fmt):
+        self.stream, self.fmt = stream, fmt
+        if fmt == "csv":
+            self.csv = csv.DictWriter(stream, RECORD_FIELDS, extrasaction="ignore")
+            self.csv.writeheader()
+
+    def write(self, **record):
+        record.setdefault("ts", round(time.time(), 3))
+        if self.fmt == "csv":
+            self.csv.writerow(record)
+        else:
+            self.stream.write(json.dumps(record) + "\n")
+        self.stream.flush()
+
+
+def parse_targets(text):
+    """Hosts to scan from a comma separated list of CIDR blocks (any size),
+    single addresses, or the legacy "192.168.1." prefix form (a /24)."""
+    nets = []
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        if part.endswith("."):
+            part = part + "0/24"
+        nets.append(ipaddress.ip_network(part, strict=False))
+    return nets
+
+
+def iter_hosts(nets):
+    for net in nets:
+        if net.num_addresses == 1:
+            yield str(net.network_address)
+        else:
+            yield from map(str, net.hosts())
+
+
+class HostRange:
+    """Re-iterable view of the hosts in ``nets``: every pass regenerates
+    them, so a port sweep can walk the range once per port without ever
+    holding it in memory."""
+
+    def __init__(self, nets):
+        self.nets = nets
+
+    def __iter__(self):
+        return iter_hosts(self.nets)
+
+
+def count_hosts(nets):
+    # Matches what hosts() yields: no network/broadcast address except on /31 and /32.
+    return sum(n.num_addresses if n.prefixlen >= n.max_prefixlen - 1
+               else n.num_addresses - (2 if n.version == 4 else 1) for n in nets)
+
+
+def ping_command(ip, timeout):
+    if sys.platform == "win32":
+        return ["ping", "-n", "1", "-w", str(int(timeout * 1000)), ip]
+    if sys.platform == "darwin":
+        return ["ping", "-n", "-c", "1", "-W", str(int(timeout * 1000)), ip]
+    # iputils wants whole seconds for -W on older releases.
+    return ["ping", "-n", "-c", "1", "-W", str(max(1, math.ceil(timeout))), ip]
+
+
+async def ping_probe(ip, timeout):
+    # -W only makes ping give up on its own; the deadline is enforced here,
+    # since ping rounds it up (to a whole second on Linux) and the learned
+    # per-host timeouts are usually far shorter than that.
+    t0 = time.perf_counter()
+    try:
+        proc = await asyncio.create_subprocess_exec(*ping_command(ip, timeout), stdout=asyncio.subprocess.PIPE,
+                                                    stderr=asyncio.subprocess.DEVNULL)
+    except (FileNotFoundError, PermissionError) as e:
+        raise ProbeUnavailable(f"cannot run ping ({e.strerror}); use -m tcp") from e
+    try:
+        out, _ = await asyncio.wait_for(proc.communicate(), timeout + PING_GRACE)
+    except asyncio.TimeoutError:
+        try:
+            proc.kill()
+        except ProcessLookupError:  # exited right at the deadline
+            pass
+        await proc.wait()
+        return None
+    if proc.returncode != 0:
+        return None
+    m = RTT_RE.search(out)
+    return float(m.group(1)) / 1000 if m else time.perf_counter() - t0
+
+
+async def tcp_probe(ip, timeout, ports=PROBE_PORTS):
+    t0 = time.perf_counter()
+
+    async def knock(port):
+        try:
+            _, writer = await asyncio.open_connection(ip, port)
+        except ConnectionRefusedError:
+            return True
+        except OSError as e:
+            if out_of_fds(e):
+                raise  # says nothing about the host
+            return False
+        writer.close()
+        return True
+
+    # All ports at once, so a dead host costs one timeout rather than four.
+    tasks = [asyncio.create_task(knock(port)) for port in ports]
+    try:
+        for first in asyncio.as_completed(tasks, timeout=timeout):
+            if await first:
+                return time.perf_counter() - t0
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        for t in tasks:
+            t.cancel()
+    return None
+
+
+async def scan(targets, probe, concurrency=CONCURRENCY, timeout=PING_TIMEOUT, metrics=None, limiter=None):
+    """Probe ``targets`` with at most ``concurrency`` probes in flight and
+    yield (target, result) as each one finishes. Targets are pulled lazily
+    and the result queue is bounded, so memory does not grow with the range
+    size. With a ``limiter`` each probe first waits for a rate-limit token.
+    A probe that raises counts as an error and yields None for its target;
+    ProbeUnavailable ends the scan."""
+    targets = iter(targets)
+    results = asyncio.Queue(maxsize=concurrency * 2)
+    done = object()
+
+    async def attempt(target):
+        if metrics:
+            metrics.begin()
+        t0 = time.perf_counter()
+        try:
+            result = await probe(target, timeout)
+        except ProbeUnavailable:
+            raise
+        except Exception:
+            if metrics:
+                metrics.end(time.perf_counter() - t0, False, timeout, error=True)
+            return None
+        if metrics:
+            metrics.end(time.perf_counter() - t0, result is not None, timeout)
+        return result
+
+    async def worker():
+        try:
+            for target in targets:
+                if limiter:
+                    await limiter.acquire()
+                await results.put((target, await attempt(target)))
+        except ProbeUnavailable as e:
+            await results.put(e)
+        finally:
+            await results.put(done)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        running = len(workers)
+        while running:
+            item = await results.get()
+            if item is done:
+                running -= 1
+            elif isinstance(item, ProbeUnavailable):
+                raise item
+            else:
+                yield item
+    finally:
+        for w in workers:
+            w.cancel()
+
+
+def parse_ports(text):
+    """"22,80,8000-8100" -> sorted unique port list."""
+    ports = set()
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        lo, _, hi = part.partition("-")
+        if not (lo.isdigit() and (hi or lo).isdigit()):
+            raise ValueError(f"bad port range {part!r}")
+        lo, hi = int(lo), int(hi or lo)
+        if not 0 < lo <= hi <= 65535:
+            raise ValueError(f"bad port range {part!r}")
+        ports.update(range(lo, hi + 1))
+    return sorted(ports)
+
+
+def fd_budget(requested, reserve=64):
+    """Cap connect concurrency below the process's open-file limit."""
+    if resource is None:
+        return requested
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        return requested
+    return max(1, min(requested, soft - reserve))
+
+
+class RateLimiter:
+    """Token bucket shared by every connect worker: at most ``rate`` new
+    connections per second, in bursts of up to a tenth of a second's worth."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.capacity = max(1.0, rate / 10)
+        self.tokens = self.capacity
+        self.last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class FingerprintCache:
+    """Banner fingerprints per (host, port) kept in SQLite between runs, so a
+    repeat sweep only has to confirm the port is open. Entries older than
+    ``ttl`` are grabbed again; writes are batched."""
+
+    def __init__(self, path, ttl=FINGERPRINT_TTL):
+        self.ttl = ttl
+        self.db = sqlite3.connect(path)
+        self.db.execute("""CREATE TABLE IF NOT EXISTS fingerprints(
+            host TEXT NOT NULL, port INTEGER NOT NULL, service TEXT, banner TEXT,
+            seen REAL NOT NULL, PRIMARY KEY (host, port))""")
+        self.db.commit()
+        self.pending = []
+        self.hits = self.misses = 0
+
+    def get(self, host, port):
+        row = self.db.execute("SELECT service, banner, seen FROM fingerprints WHERE host=? AND port=?",
+                              (host, port)).fetchone()
+        if row is None or row[2] + self.ttl < time.time():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0], row[1]
+
+    def put(self, host, port, service, banner):
+        self.pending.append((host, port, service, banner, time.time()))
+        if len(self.pending) >= 500:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.db.executemany("INSERT OR REPLACE INTO fingerprints VALUES (?,?,?,?,?)", self.pending)
+            self.db.commit()
+            self.pending.clear()
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+
+def guess_service(port, banner):
+    b = banner.lower()
+    for prefix, name in (("ssh-", "ssh"), ("http/", "http"), ("+ok", "pop3"), ("* ok", "imap"),
+                         ("rfb ", "vnc"), ("220", "ftp" if port in (20, 21) else "smtp")):
+        if b.startswith(prefix):
+            return name
+    try:
+        return socket.getservbyport(port, "tcp")
+    except OSError:
+        return "unknown"
+
+
+async def grab_banner(reader, writer, port, timeout=BANNER_TIMEOUT):
+    # Most line protocols greet first; HTTP only answers once asked.
+    if port in HTTP_PORTS:
+        writer.write(b"HEAD / HTTP/1.0\r\n\r\n")
+    try:
+        data = await asyncio.wait_for(reader.read(BANNER_BYTES), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return ""
+    return data.decode("latin-1").split("\n", 1)[0].strip()
+
+
+async def port_probe(target, timeout, fingerprints):
+    """Connect to (ip, port); None if closed/filtered, else (rtt, service,
+    banner, cached)."""
+    ip, port = target
+    t0 = time.perf_counter()
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+    except OSError as e:
+        if out_of_fds(e):
+            raise
+        return None
+    except asyncio.TimeoutError:
+        return None
+    rtt = time.perf_counter() - t0
+    try:
+        known = fingerprints.get(ip, port)
+        if known:
+            return rtt, known[0], known[1], True
+        banner = await grab_banner(reader, writer, port)
+        service = guess_service(port, banner)
+        fingerprints.put(ip, port, service, banner)
+        return rtt, service, banner, False
+    finally:
+        writer.close()
+
+
+async def sweep(hosts, ports, args, metrics=None):
+    """Stream (ip, port, rtt, service, banner, cached) for every open port.
+    ``hosts`` is walked once per port, so it must be re-iterable."""
+    limiter = RateLimiter(args.rate)
+    fingerprints = FingerprintCache(args.state)
+    concurrency = fd_budget(args.port_concurrency)
+    # Port-major order spreads the load instead of hammering one host at a time.
+    targets = ((ip, port) for port in ports for ip in hosts)
+    probe = partial(port_probe, fingerprints=fingerprints)
+    try:
+        async for (ip, port), hit in scan(targets, probe, concurrency, args.port_timeout, metrics, limiter):
+            if hit:
+                yield (ip, port) + hit
+    finally:
+        fingerprints.close()
+
+
+class ScanState:
+    """Liveness history per host in the scanner's SQLite file: when it was
+    last seen up, and a smoothed RTT and RTT variance (RFC 6298 style) used
+    to size its next probe timeout. Only hosts that have answered at least
+    once are stored, so the table tracks the live population, not the
+    address space."""
+
+    ALPHA, BETA = 1 / 8, 1 / 4
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        self.db.execute("""CREATE TABLE IF NOT EXISTS hosts(
+            ip TEXT PRIMARY KEY, alive INTEGER NOT NULL, last_seen REAL NOT NULL,
+            last_checked REAL NOT NULL, srtt REAL NOT NULL, rttvar REAL NOT NULL)""")
+        self.db.commit()
+        self.pending = []
+
+    def active_in(self, nets):
+        """{ip: (srtt, rttvar)} for hosts inside ``nets`` that were up on the
+        last sweep, most recently seen first."""
+        rows = self.db.execute("SELECT ip, srtt, rttvar FROM hosts WHERE alive=1 ORDER BY last_seen DESC")
+        history = {}
+        for ip, srtt, rttvar in rows:
+            addr = ipaddress.ip_address(ip)
+            if any(addr in net for net in nets):
+                history[ip] = (srtt, rttvar)
+        return history
+
+    def record(self, ip, rtt, previous=None):
+        now = time.time()
+        if rtt is None:
+            self.pending.append(("UPDATE hosts SET alive=0, last_checked=? WHERE ip=?", (now, ip)))
+        else:
+            if previous:
+                srtt, rttvar = previous
+                rttvar = (1 - self.BETA) * rttvar + self.BETA * abs(srtt - rtt)
+                srtt = (1 - self.ALPHA) * srtt + self.ALPHA * rtt
+            else:
+                srtt, rttvar = rtt, rtt / 2
+            self.pending.append(("INSERT OR REPLACE INTO hosts VALUES (?,1,?,?,?,?)", (ip, now, now, srtt, rttvar)))
+        if len(self.pending) >= 500:
+            self.flush()
+
+    def flush(self):
+        for sql, params in self.pending:
+            self.db.execute(sql, params)
+        self.db.commit()
+        self.pending.clear()
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+
+def adaptive_timeout(history, ceiling):
+    srtt, rttvar = history
+    return max(MIN_TIMEOUT, min(ceiling, srtt + 4 * rttvar))
+
+
+def adaptive_probe(probe, history):
+    """Probe known hosts with a timeout learned from their RTTs, falling
+    back to the full timeout once before calling them down."""
+    async def run(ip, timeout):
+        known = history.get(ip)
+        if known:
+            rtt = await probe(ip, adaptive_timeout(known, timeout))
+            if rtt is not None:
+                return rtt
+        return await probe(ip, timeout)
+    return run
+
+
+def pick_probe(method):
+    if method == "auto":
+        method = "ping" if shutil.which("ping") else "tcp"
+    return method, ping_probe if method == "ping" else tcp_probe
+
+
+def open_output(args):
+    if not args.output:
+        return None
+    fmt = args.format or ("csv" if args.output.endswith(".csv") else "ndjson")
+    stream = sys.stdout if args.output == "-" else open(args.output, "w", newline="" if fmt == "csv" else None,
+                                                          encoding="utf-8")
+    return RecordWriter(stream, fmt)
+
+
+async def run(args, nets, ports):
+    method, probe = pick_probe(args.method)
+    writer = open_output(args)
+    # Human-readable progress moves to stderr when records go to stdout.
+    say = partial(print, file=sys.stderr if args.output == "-" else sys.stdout)
+    emit = writer.write if writer else lambda **record: None
+    metrics = ScanMetrics()
+    reporter = None
+    if args.metrics_interval or args.metrics_file:
+        reporter = asyncio.create_task(report_metrics(metrics, args.metrics_interval or 5.0, args.metrics_file,
+                                                      sys.stderr if args.metrics_interval else None))
+    try:
+        await sweep_network(args, nets, ports, method, probe, say, emit, metrics)
+    finally:
+        if reporter:
+            reporter.cancel()
+        if args.metrics_file:
+            with open(args.metrics_file, "w", encoding="utf-8") as f:
+                json.dump(metrics.snapshot(), f)
+        if writer and writer.stream is not sys.stdout:
+            writer.stream.close()
+
+
+async def sweep_network(args, nets, ports, method, probe, say, emit, metrics):
+    active_hosts = inactive_hosts = 0
+    t0 = time.perf_counter()
+    # Only live hosts are ever held in memory (for the port phase); down hosts
+    # are counted and, with --all, streamed out, never collected.
+    active_list = []
+    if args.skip_ping:
+        active_list, active_hosts = HostRange(nets), count_hosts(nets)
     else:
-        inactive_list.append(ip)
-        inactive_hosts += 1
+        state = ScanState(args.state)
+        history = state.active_in(nets)
+        # After the first sweep only changes are reported, unless --full.
+        diff = bool(history) and not args.full
+        unseen = set(history)
+        # A known host whose probe failed (rather than went unanswered) is
+        # not reported as vanished; it stays unconfirmed.
+        unconfirmed = set()
+        adaptive = adaptive_probe(probe, history)
+
+        async def probe_known(ip, timeout):
+            try:
+                return await adaptive(ip, timeout)
+            except ProbeUnavailable:
+                raise
+            except Exception:
+                if ip in history:
+                    unconfirmed.add(ip)
+                raise
+
+        # Hosts that were up last time go first; the rest of the range follows.
+        order = chain(history, (ip for ip in iter_hosts(nets) if ip not in history))
+        say(f"Scanning {count_hosts(nets)} hosts ({method}, {args.concurrency} at a time, "
+            f"{len(history)} known active)...\n")
+        try:
+            async for ip, rtt in scan(order, probe_known, args.concurrency, args.timeout, metrics):
+                if ip in unconfirmed:
+                    continue
+                if ip in history:
+                    state.record(ip, rtt, history[ip])
+                elif rtt is not None:
+                    state.record(ip, rtt)
+                if rtt is None:
+                    inactive_hosts += 1
+                    if args.all:
+                        emit(type="host", ip=ip, alive=False)
+                    continue
+                active_hosts += 1
+                unseen.discard(ip)
+                if ports:
+                    active_list.append(ip)
+                change = "new" if history and ip not in history else None
+                emit(type="host", ip=ip, alive=True, rtt_ms=round(rtt * 1000, 3), change=change)
+                if not diff:
+                    say(f"{ip} is Active ({rtt * 1000:.1f} ms)")
+                elif change:
+                    say(f"+ {ip} is New ({rtt * 1000:.1f} ms)")
+        finally:
+            state.close()
+        unseen -= unconfirmed
+        for ip in sorted(unseen, key=ipaddress.ip_address):
+            emit(type="host", ip=ip, alive=False, change="vanished")
+            if diff:
+                say(f"- {ip} Vanished")
+    elapsed = time.perf_counter() - t0
+
+    if not args.skip_ping:
+        say(f"\nActive Hosts: {active_hosts}")
+        say(f"Inactive Hosts: {inactive_hosts}")
+        if metrics.errors:
+            say(f"Failed Probes: {metrics.errors}")
+        if diff:
+            say(f"New Hosts: {active_hosts - (len(history) - len(unseen) - len(unconfirmed))}")
+            say(f"Vanished Hosts: {len(unseen)}")
+            if unconfirmed:
+                say(f"Unconfirmed Hosts: {len(unconfirmed)} (probe failed, still listed as active)")
+        say(f"Scanning Complete in {elapsed:.1f}s!\n")
+
+    if ports and active_hosts:
+        say(f"Sweeping {len(ports)} ports on {active_hosts} hosts (max {args.rate:g} connects/s)...\n")
+        open_ports, errors = 0, metrics.errors
+        t0 = time.perf_counter()
+        async for ip, port, rtt, service, banner, cached in sweep(active_list, ports, args, metrics):
+            open_ports += 1
+            emit(type="port", ip=ip, port=port, alive=True, rtt_ms=round(rtt * 1000, 3), service=service,
+                 banner=banner)
+            say(f"{ip}:{port:<5} open  {service:<10} {banner[:60]}{'  (cached)' if cached else ''}")
+        say(f"\nOpen Ports: {open_ports}")
+        if metrics.errors > errors:
+            say(f"Failed Connects: {metrics.errors - errors} (counted as closed)")
+        say(f"Sweep Complete in {time.perf_counter() - t0:.1f}s!\n")
+
 
-print("Active Hosts: " + active_hosts)
-print("Inactive Hosts: " + inactive_hosts)
+def main():
+    ap = argparse.ArgumentParser(description="Concurrent subnet liveness scanner.")
+    ap.add_argument("targets", nargs="?", help='CIDR blocks, addresses or a "192.168.1." prefix, comma separated')
+    ap.add_argument("-c", "--concurrency", type=int, default=CONCURRENCY, help="probes in flight")
+    ap.add_argument("-t", "--timeout", type=float, default=PING_TIMEOUT, help="seconds per probe")
+    ap.add_argument("-m", "--method", choices=("auto", "ping", "tcp"), default="auto",
+                    help="ICMP via the system ping, or TCP connect (auto: ping if installed)")
+    ap.add_argument("--state", default=STATE_DB, help="SQLite file for host history and port fingerprints")
+    ap.add_argument("--full", action="store_true", help="list every active host instead of new/vanished ones")
+    out = ap.add_argument_group("output")
+    out.add_argument("-o", "--output", help='stream records to this file ("-" for stdout)')
+    out.add_argument("-f", "--format", choices=("ndjson", "csv"), help="record format (default: from extension, else ndjson)")
+    out.add_argument("--all", action="store_true", help="also write a record for every host that did not answer")
+    out.add_argument("--metrics-interval", type=float, default=0, help="print live counters every N seconds")
+    out.add_argument("--metrics-file", help="keep a JSON snapshot of the live counters in this file")
+    sw = ap.add_argument_group("port sweep")
+    sw.add_argument("-p", "--ports", help='sweep these TCP ports on active hosts, e.g. "22,80,8000-8100" or "1-65535"')
+    sw.add_argument("--skip-ping", action="store_true", help="treat every target as active")
+    sw.add_argument("--rate", type=float, default=PORT_RATE, help="max new connections per second (0: unlimited)")
+    sw.add_argument("--port-concurrency", type=int, default=PORT_CONCURRENCY,
+                    help="connections in flight (capped below the open-file limit)")
+    sw.add_argument("--port-timeout", type=float, default=PORT_TIMEOUT, help="seconds per connect")
+    args = ap.parse_args()
 
-print("Scanning Complete!\n")
+    print("Network Scanner starting...\n", file=sys.stderr if args.output == "-" else sys.stdout)
+    if not args.targets:
+        args.targets = input("Enter your subnet(example: 192.168.1. or 10.0.0.0/16): ").strip()
+    # Bad input fails here, before any probing starts.
+    try:
+        nets = parse_targets(args.targets)
+    except ValueError as e:
+        sys.exit(f"Invalid target: {e}")
+    try:
+        ports = parse_ports(args.ports) if args.ports else None
+    except ValueError as e:
+        sys.exit(f"Invalid ports: {e}")
+    if args.method == "ping" and not args.skip_ping and not shutil.which("ping"):
+        sys.exit("ping not found; use -m tcp")
+    try:
+        asyncio.run(run(args, nets, ports))
+    except ProbeUnavailable as e:
+        sys.exit(f"Scan stopped: {e}")
+    except KeyboardInterrupt:
+        print("\nScan interrupted")
 
 
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,53 @@
 from flask import Flask, request, render_template_string, jsonify
-import requests, os, textwrap
-from bs4 import BeautifulSoup
-import google.generativeai as genai
-
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise RuntimeError("GEMINI_API_KEY not found")
-
-genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel("models/gemini-2.5-flash-lite")
+import requests, os, textwrap, threading, time, codecs, json, sqlite3, hashlib, re
+from html.parser import HTMLParser
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import lru_cache
+from urllib.parse import urlparse, urlsplit
+from requests.adapters import HTTPAdapter
+import psl_index
+
+
+class FakeModel:
+    """Local stand-in for the Gemini model (STRUCTURA_FAKE_LLM=1): answers
+    after ``delay`` seconds and counts how often it was called."""
+
+    def __init__(self, delay=float(os.getenv("STRUCTURA_FAKE_LLM_DELAY", "0.5"))):
+        self.delay, self.calls = delay, 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        question = prompt.strip().rsplit("\n", 1)[-1]
+        return type("Response", (), {"text": f"(fake) On '{question}': keep the core journey short."})()
+
+
+MODEL_NAME = "models/gemini-2.5-flash-lite"
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    """The chat model, created on first use. google.generativeai is only
+    imported here, so importing Structura and serving /analyze need neither
+    the library nor a GEMINI_API_KEY. Returns None when no key is set."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                if os.getenv("STRUCTURA_FAKE_LLM"):
+                    _model = FakeModel()
+                else:
+                    api_key = os.getenv("GEMINI_API_KEY")
+                    if not api_key:
+                        return None
+                    import google.generativeai as genai
+                    genai.configure(api_key=api_key)
+                    _model = genai.GenerativeModel(MODEL_NAME)
+    return _model
 
 STRUCTURA_LOGO_BASE64 = """
 
@@ -203,10 +242,21 @@ document.getElementById("output").innerHTML=`
 <div class="score">${d.score}</div>
 <div class="meta">Structural Load • ${d.status}</div>
 ${d.signals.map(s=>`<div class="signal">${s}</div>`).join("")}
+${d.metrics?`<div class="meta">${(d.metrics.page_bytes/1024).toFixed(0)} KB • depth ${d.metrics.dom_depth} • ${d.metrics.scripts} scripts • ${d.metrics.stylesheets} stylesheets • ${d.metrics.third_party_origins} third-party origins</div>`:""}
+${d.changes?Object.entries(d.changes).map(([k,c])=>`<div class="signal">${k}: ${c.added?`+${c.added.length} / -${c.removed.length}`:`${c.before} → ${c.after}`}</div>`).join(""):""}
 </div>`
 })
 }
 
+function reply(d){
+if(d.reply===undefined){
+setTimeout(()=>fetch(d.poll).then(r=>r.json()).then(reply),d.retry_ms||500)
+return
+}
+document.getElementById("chat").innerHTML+=
+`<div class="bubble marin">${d.reply}</div>`
+}
+
 function send(){
 let msg=document.getElementById("msg").value
 if(!analysis)return
@@ -215,10 +265,7 @@ document.getElementById("chat").innerHTML+=
 
 fetch("/chat",{method:"POST",headers:{"Content-Type":"application/json"},
 body:JSON.stringify({msg:msg,analysis:analysis})})
-.then(r=>r.json()).then(d=>{
-document.getElementById("chat").innerHTML+=
-`<div class="bubble marin">${d.reply}</div>`
-})
+.then(r=>r.json()).then(reply)
 document.getElementById("msg").value=""
 }
 </script>
@@ -226,45 +273,549 @@ document.getElementById("msg").value=""
 </html>
 """
 
-def analyze_site(url):
+FETCH_TIMEOUT = (3, 8)
+POOL_SIZE = int(os.getenv("STRUCTURA_POOL_SIZE", "32"))
+BATCH_WORKERS = int(os.getenv("STRUCTURA_BATCH_WORKERS", "16"))
+PER_HOST_LIMIT = int(os.getenv("STRUCTURA_PER_HOST", "4"))
+BATCH_TIMEOUT = float(os.getenv("STRUCTURA_BATCH_TIMEOUT", "20"))
+BATCH_MAX_URLS = int(os.getenv("STRUCTURA_BATCH_MAX_URLS", "100"))
+
+_local = threading.local()
+
+
+def http_session():
+    # One keep-alive session per worker thread: connections are reused across
+    # analyses instead of a fresh TCP/TLS handshake for every request.
+    s = getattr(_local, "session", None)
+    if s is None:
+        s = requests.Session()
+        s.headers["User-Agent"] = "Mozilla/5.0"
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+        s.mount("http://", adapter)
+        s.mount("https://", adapter)
+        _local.session = s
+    return s
+
+
+class HostQueue:
+    """Per-host admission in front of a shared pool: at most ``limit`` tasks
+    per host hold a pool worker, the rest wait in that host's queue and are
+    submitted as its slots free up, so a slow host never ties up workers
+    other hosts could use. Hosts with nothing running or queued are dropped.
+    Cancelling a returned future that has not started yet removes it."""
+
+    def __init__(self, pool, limit):
+        self.pool, self.limit = pool, limit
+        self._hosts = {}  # host -> [running, deque of (future, fn, args)]
+        self._lock = threading.Lock()
+
+    def submit(self, url, fn, *args):
+        host = urlparse(normalize_url(url)).hostname or ""
+        future = Future()
+        with self._lock:
+            self._hosts.setdefault(host, [0, deque()])[1].append((future, fn, args))
+        self._pump(host)
+        return future
+
+    def _pump(self, host, finished=0):
+        start = []
+        with self._lock:
+            state = self._hosts[host]
+            state[0] -= finished
+            while state[0] < self.limit and state[1]:
+                future, fn, args = state[1].popleft()
+                if future.set_running_or_notify_cancel():
+                    state[0] += 1
+                    start.append((future, fn, args))
+            if not state[0] and not state[1]:
+                del self._hosts[host]
+        for job in start:
+            self.pool.submit(self._run, host, *job)
+
+    def _run(self, host, future, fn, args):
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            self._pump(host, finished=1)
+
+
+fetch_pool = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="fetch")
+fetch_queue = HostQueue(fetch_pool, PER_HOST_LIMIT)
+
+
+def normalize_url(url):
+    url = url.strip()
+    if not url.startswith("http"):
+        url = "https://" + url
+    return url
+
+
+UNREACHABLE = (0, "Unreachable", [
+    "Target could not be analyzed",
+    "The site may block automated inspection",
+    "Network or protocol failure detected"
+])
+
+
+COUNTED_TAGS = ("a", "form", "input", "button")
+CHUNK_SIZE = 64 * 1024
+
+
+VOID_TAGS = frozenset("area base br col embed hr img input link meta param source track wbr".split())
+BLOCK_TAGS = frozenset("address article aside blockquote div dl fieldset footer form h1 h2 h3 h4 h5 h6 "
+                       "header hr main nav ol p pre section table ul".split())
+# Elements whose end tag is optional: these starts close the open one.
+IMPLIED_END = {"p": BLOCK_TAGS, "li": {"li"}, "dt": {"dt", "dd"}, "dd": {"dt", "dd"},
+               "option": {"option"}, "tr": {"tr"}, "td": {"td", "th", "tr"}, "th": {"td", "th", "tr"}}
+METRIC_KEYS = ("page_bytes", "elements", "dom_depth", "dom_width", "scripts", "external_scripts",
+               "inline_script_bytes", "stylesheets", "inline_css_bytes", "inline_style_bytes",
+               "images", "iframes", "third_party_origins")
+
+
+@lru_cache(maxsize=4096)
+def site_of(host):
+    parts = psl_index.extract(host)
+    return f"{parts.domain}.{parts.suffix}".lower() if parts.suffix else host.lower()
+
+
+class PageMetrics(HTMLParser):
+    """Structural metrics gathered in one streaming pass over the markup: tag
+    counts, DOM shape (depth, widest child list), script/stylesheet weight,
+    inline styles and the origins subresources load from. Only a stack of
+    open elements is kept, never a tree."""
+
+    def __init__(self, tags=COUNTED_TAGS, page_url=None):
+        super().__init__(convert_charrefs=False)
+        self.counts = dict.fromkeys(tags, 0)
+        self.m = dict.fromkeys(METRIC_KEYS, 0)
+        self.page_site = site_of(urlsplit(page_url).hostname or "") if page_url else None
+        self.hosts = set()
+        self._stack = []
+        self._children = [0]
+        self._raw = None
+
+    def _resource(self, ref):
+        if ref and ("//" in ref[:8]):
+            host = urlsplit(ref.strip()).hostname
+            if host:
+                self.hosts.add(host)
+
+    def handle_starttag(self, tag, attrs):
+        m = self.m
+        if tag in self.counts:
+            self.counts[tag] += 1
+        stack = self._stack
+        while stack and tag in IMPLIED_END.get(stack[-1], ()):
+            stack.pop()
+            self._children.pop()
+        m["elements"] += 1
+        self._children[-1] += 1
+        if self._children[-1] > m["dom_width"]:
+            m["dom_width"] = self._children[-1]
+        if tag not in VOID_TAGS:
+            stack.append(tag)
+            self._children.append(0)
+            if len(stack) > m["dom_depth"]:
+                m["dom_depth"] = len(stack)
+
+        if tag in ("script", "link", "img", "iframe", "style") or attrs and any(k == "style" for k, _ in attrs):
+            a = dict(attrs)
+            if a.get("style"):
+                m["inline_style_bytes"] += len(a["style"].encode("utf-8"))
+            if tag == "script":
+                m["scripts"] += 1
+                if a.get("src"):
+                    m["external_scripts"] += 1
+                    self._resource(a["src"])
+                else:
+                    self._raw = "inline_script_bytes"
+            elif tag == "style":
+                m["stylesheets"] += 1
+                self._raw = "inline_css_bytes"
+            elif tag == "link":
+                if "stylesheet" in (a.get("rel") or "").lower().split():
+                    m["stylesheets"] += 1
+                    self._resource(a.get("href"))
+            elif tag == "img":
+                m["images"] += 1
+                self._resource(a.get("src"))
+            elif tag == "iframe":
+                m["iframes"] += 1
+                self._resource(a.get("src"))
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style"):
+            self._raw = None
+        stack = self._stack
+        if tag in stack:
+            while stack:
+                self._children.pop()
+                if stack.pop() == tag:
+                    break
+
+    def handle_data(self, data):
+        if self._raw:
+            self.m[self._raw] += len(data.encode("utf-8"))
+
+    def feed_response(self, response, chunk_size=CHUNK_SIZE):
+        """Feed a streamed ``requests`` response, counting its raw bytes."""
+        try:
+            decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+        except LookupError:  # unknown charset label: decode as UTF-8, like r.text would guess
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        for block in response.iter_content(chunk_size):
+            self.m["page_bytes"] += len(block)
+            self.feed(decoder.decode(block))
+        self.feed(decoder.decode(b"", final=True))
+        self.close()
+        return self
+
+    def metrics(self):
+        m = dict(self.m, links=self.counts.get("a", 0), forms=self.counts.get("form", 0),
+                 inputs=self.counts.get("input", 0), buttons=self.counts.get("button", 0))
+        origins = sorted({site_of(h) for h in self.hosts} - {self.page_site})
+        m["third_party_origins"] = len(origins)
+        m["origins"] = origins
+        return m
+
+
+def count_tags(chunks, tags=COUNTED_TAGS):
+    counter = PageMetrics(tags)
+    for chunk in chunks:
+        counter.feed(chunk)
+    counter.close()
+    return counter.counts
+
+
+def score_counts(counts):
+    links = counts["a"]
+    forms = counts["form"]
+    inputs = counts["input"]
+    buttons = counts["button"]
+
+    density = links + forms + inputs + buttons
+    score = min(100, int(density * 0.6))
+
+    signals = []
+    if links > 80: signals.append("Navigation surface is dense")
+    if forms > 4: signals.append("Multiple workflows coexist")
+    if inputs > 25: signals.append("Configuration complexity is high")
+    if not signals: signals.append("Structure is lean")
+
+    status = "Lean"
+    if score > 45: status = "Overextended"
+    if score > 70: status = "Obese"
+
+    return score, status, signals
+
+
+class AnalysisCache:
+    """SQLite-backed store of analysis results plus the validators (ETag /
+    Last-Modified) of the response they came from. Entries older than ttl
+    are dropped; past max_entries the least recently used go first."""
+
+    def __init__(self, path, ttl, max_entries):
+        self.ttl, self.max_entries = ttl, max_entries
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS analysis(
+            url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT,
+            result TEXT NOT NULL, stored REAL NOT NULL, used REAL NOT NULL)""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS analysis_used ON analysis(used)")
+        self.db.commit()
+        self.stats = dict.fromkeys(("revalidated", "misses", "changed", "stores", "expired", "evictions"), 0)
+
+    def get(self, url):
+        now = time.time()
+        with self._lock:
+            row = self.db.execute("SELECT etag, last_modified, result, stored FROM analysis WHERE url=?",
+                                  (url,)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            if row[3] + self.ttl <= now:
+                self.db.execute("DELETE FROM analysis WHERE url=?", (url,))
+                self.db.commit()
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            result = json.loads(row[2])
+            if not isinstance(result, dict):
+                # Bare (score, status, signals) rows predate stored metrics.
+                self.stats["misses"] += 1
+                return None
+            return row[0], row[1], result
+
+    def revalidated(self, url):
+        now = time.time()
+        with self._lock:
+            self.db.execute("UPDATE analysis SET stored=?, used=? WHERE url=?", (now, now, url))
+            self.db.commit()
+            self.stats["revalidated"] += 1
+
+    def changed(self):
+        with self._lock:
+            self.stats["changed"] += 1
+
+    def put(self, url, etag, last_modified, result):
+        now = time.time()
+        with self._lock:
+            self.db.execute("INSERT OR REPLACE INTO analysis VALUES (?,?,?,?,?,?)",
+                            (url, etag, last_modified, json.dumps(result), now, now))
+            self.stats["stores"] += 1
+            excess = self.db.execute("SELECT COUNT(*) FROM analysis").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self.db.execute("DELETE FROM analysis WHERE url IN "
+                                "(SELECT url FROM analysis ORDER BY used LIMIT ?)", (excess,))
+                self.stats["evictions"] += excess
+            self.db.commit()
+
+    def metrics(self):
+        with self._lock:
+            entries = self.db.execute("SELECT COUNT(*) FROM analysis").fetchone()[0]
+            m = dict(self.stats, entries=entries, max_entries=self.max_entries, ttl=self.ttl)
+        lookups = m["revalidated"] + m["changed"] + m["misses"]
+        m["hit_rate"] = round(m["revalidated"] / lookups, 4) if lookups else 0.0
+        return m
+
+
+analysis_cache_path = os.getenv("STRUCTURA_CACHE_DB", "structura_cache.sqlite3")
+analysis_cache = AnalysisCache(analysis_cache_path,
+                               float(os.getenv("STRUCTURA_CACHE_TTL", str(24 * 3600))),
+                               int(os.getenv("STRUCTURA_CACHE_MAX", "5000")))
+
+
+class SnapshotStore:
+    """Per-URL history of page metrics in the same SQLite file as the
+    analysis cache. Each fresh analysis is diffed against the previous
+    snapshot, so a re-run only reports what moved; the newest ``keep``
+    snapshots per URL are retained."""
+
+    def __init__(self, path, keep):
+        self.keep = keep
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS snapshots(
+            url TEXT NOT NULL, taken REAL NOT NULL, metrics TEXT NOT NULL)""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS snapshots_url ON snapshots(url, taken)")
+        self.db.commit()
+
+    def record(self, url, metrics):
+        """Store ``metrics`` for ``url`` and return the diff against the
+        previous snapshot (None when this is the first one)."""
+        with self._lock:
+            row = self.db.execute("SELECT metrics FROM snapshots WHERE url=? ORDER BY taken DESC LIMIT 1",
+                                  (url,)).fetchone()
+            self.db.execute("INSERT INTO snapshots VALUES (?,?,?)", (url, time.time(), json.dumps(metrics)))
+            self.db.execute("""DELETE FROM snapshots WHERE url=? AND rowid NOT IN
+                (SELECT rowid FROM snapshots WHERE url=? ORDER BY taken DESC LIMIT ?)""", (url, url, self.keep))
+            self.db.commit()
+        return diff_metrics(json.loads(row[0]), metrics) if row else None
+
+    def history(self, url, limit=None):
+        with self._lock:
+            rows = self.db.execute("SELECT taken, metrics FROM snapshots WHERE url=? ORDER BY taken DESC LIMIT ?",
+                                   (url, limit or self.keep)).fetchall()
+        return [{"taken": taken, "metrics": json.loads(m)} for taken, m in rows]
+
+
+def diff_metrics(before, after):
+    changes = {}
+    for k, v in after.items():
+        old = before.get(k)
+        if k == "origins":
+            added, removed = sorted(set(v) - set(old or ())), sorted(set(old or ()) - set(v))
+            if added or removed:
+                changes[k] = {"added": added, "removed": removed}
+        elif old != v:
+            changes[k] = {"before": old, "after": v,
+                          "delta": v - old if isinstance(old, (int, float)) else None}
+    return changes
+
+
+snapshots = SnapshotStore(analysis_cache_path, int(os.getenv("STRUCTURA_SNAPSHOTS", "30")))
+
+
+def report(score, status, signals, metrics=None, changes=None):
+    return {"score": score, "status": status, "signals": signals, "metrics": metrics, "changes": changes}
+
+
+def inspect_site(url):
+    """Full analysis of ``url``: score, status and signals plus the page
+    metrics and what changed since the last snapshot. A 304 revalidation
+    reuses the stored report and reports no changes."""
     try:
-        if not url.startswith("http"):
-            url = "https://" + url
+        url = normalize_url(url)
+
+        cached = analysis_cache.get(url)
+        headers = {}
+        if cached:
+            etag, last_modified, result = cached
+            if etag: headers["If-None-Match"] = etag
+            if last_modified: headers["If-Modified-Since"] = last_modified
+
+        with http_session().get(url, timeout=FETCH_TIMEOUT, stream=True, headers=headers) as r:
+            if cached and r.status_code == 304:
+                analysis_cache.revalidated(url)
+                return dict(result, changes={})
+            page = PageMetrics(page_url=r.url).feed_response(r)
+            etag, last_modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+            ok = r.status_code == 200
+
+        metrics = page.metrics()
+        result = report(*score_counts(page.counts), metrics)
+        if cached:
+            analysis_cache.changed()
+        if ok and (etag or last_modified):
+            analysis_cache.put(url, etag, last_modified, result)
+        if ok:
+            result["changes"] = snapshots.record(url, metrics)
+        return result
 
-        r = requests.get(
-            url,
-            timeout=8,
-            headers={"User-Agent": "Mozilla/5.0"}
-        )
+    except Exception as e:
+        return report(*UNREACHABLE)
 
-        soup = BeautifulSoup(r.text, "html.parser")
 
-        links = len(soup.find_all("a"))
-        forms = len(soup.find_all("form"))
-        inputs = len(soup.find_all("input"))
-        buttons = len(soup.find_all("button"))
+def analyze_site(url):
+    r = inspect_site(url)
+    return r["score"], r["status"], r["signals"]
 
-        density = links + forms + inputs + buttons
-        score = min(100, int(density * 0.6))
 
-        signals = []
-        if links > 80: signals.append("Navigation surface is dense")
-        if forms > 4: signals.append("Multiple workflows coexist")
-        if inputs > 25: signals.append("Configuration complexity is high")
-        if not signals: signals.append("Structure is lean")
+def analyze_many(urls, timeout=BATCH_TIMEOUT):
+    """Analyze ``urls`` concurrently on the shared fetch pool. Each host gets
+    at most PER_HOST_LIMIT requests at once; anything not finished when the
+    overall ``timeout`` runs out is reported with status "Timeout", and
+    those still queued are dropped rather than fetched later."""
+    futures = [fetch_queue.submit(u, inspect_site, u) for u in urls]
+    wait(futures, timeout=timeout)
+    results = []
+    for u, f in zip(urls, futures):
+        if f.done():
+            r = f.result()
+        else:
+            f.cancel()
+            r = report(0, "Timeout", ["Analysis did not finish within the batch time budget"])
+        results.append(dict(url=u, **r))
+    return results
 
-        status = "Lean"
-        if score > 45: status = "Overextended"
-        if score > 70: status = "Obese"
 
-        return score, status, signals
+FALLBACK_REPLY = "The concern is not the score itself, but how these signals interfere with the core user journey."
+CHAT_WAIT = float(os.getenv("STRUCTURA_CHAT_WAIT", "0.5"))
 
-    except Exception as e:
-        return 0, "Unreachable", [
-            "Target could not be analyzed",
-            "The site may block automated inspection",
-            "Network or protocol failure detected"
-        ]
+
+def marin_prompt(msg, analysis):
+    prompt=f"""
+You are Marin, a calm, sharp product consultant.
+Explain implications, not metrics.
+you don't give very long replies, you just give the required amount of answer
+
+Score: {analysis.get('score')}
+Status: {analysis.get('status')}
+Signals: {', '.join(analysis.get('signals', []))}
+
+User question:
+{msg}
+"""
+    return textwrap.dedent(prompt)
+
+
+def normalize_question(msg):
+    # Case, punctuation and spacing don't change what is being asked.
+    return " ".join(re.sub(r"[^\w\s]", " ", msg.lower()).split())
+
+
+def reply_key(msg, analysis):
+    key = json.dumps([analysis.get("score"), analysis.get("status"), list(analysis.get("signals", [])),
+                      normalize_question(msg)])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+
+
+class ReplyBroker:
+    """Runs Marin's LLM calls on a background pool. Replies are cached per
+    (score, status, signals, normalized question) in a bounded LRU with a
+    TTL, and identical questions asked while a call is running share it
+    instead of starting another. Failed calls fall back to a canned reply
+    that is only kept for ``fallback_ttl`` so the question is retried soon."""
+
+    def __init__(self, workers, maxsize, ttl, fallback_ttl=30):
+        self.maxsize, self.ttl, self.fallback_ttl = maxsize, ttl, fallback_ttl
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="marin")
+        self._replies = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.stats = dict.fromkeys(("hits", "misses", "coalesced", "calls", "failures", "evictions"), 0)
+
+    def _cached(self, key):
+        e = self._replies.get(key)
+        if e is None:
+            return None
+        if e[0] <= time.monotonic():
+            del self._replies[key]
+            return None
+        self._replies.move_to_end(key)
+        return e[1]
+
+    def _generate(self, key, prompt):
+        try:
+            model = get_model()
+            if model is None:
+                raise RuntimeError("GEMINI_API_KEY not set")
+            reply, failed = model.generate_content(prompt).text.strip(), False
+        except Exception:
+            reply, failed = FALLBACK_REPLY, True
+        ttl = self.fallback_ttl if failed else self.ttl
+        with self._lock:
+            self.stats["failures"] += failed
+            self._replies[key] = (time.monotonic() + ttl, reply)
+            self._replies.move_to_end(key)
+            while len(self._replies) > self.maxsize:
+                self._replies.popitem(last=False)
+                self.stats["evictions"] += 1
+            self._inflight.pop(key, None)
+        return reply
+
+    def ask(self, msg, analysis, wait_for=CHAT_WAIT):
+        """Return (job, reply); reply is None while generation is still
+        running after ``wait_for`` seconds, in which case poll(job)."""
+        key = reply_key(msg, analysis)
+        with self._lock:
+            reply = self._cached(key)
+            if reply is not None:
+                self.stats["hits"] += 1
+                return key, reply
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+            else:
+                self.stats["misses"] += 1
+                self.stats["calls"] += 1
+                future = self._inflight[key] = self.pool.submit(self._generate, key, marin_prompt(msg, analysis))
+        wait([future], timeout=wait_for)
+        return key, future.result() if future.done() else None
+
+    def poll(self, job):
+        with self._lock:
+            if job in self._inflight:
+                return "pending", None
+            reply = self._cached(job)
+        return ("done", reply) if reply is not None else ("unknown", None)
+
+    def metrics(self):
+        with self._lock:
+            m = dict(self.stats, entries=len(self._replies), inflight=len(self._inflight),
+                     maxsize=self.maxsize, ttl=self.ttl)
+        asked = m["hits"] + m["misses"] + m["coalesced"]
+        m["hit_rate"] = round((m["hits"] + m["coalesced"]) / asked, 4) if asked else 0.0
+        return m
+
+
+marin = ReplyBroker(int(os.getenv("STRUCTURA_LLM_WORKERS", "4")),
+                    int(os.getenv("STRUCTURA_REPLY_CACHE", "2000")),
+                    float(os.getenv("STRUCTURA_REPLY_TTL", str(6 * 3600))))
 
 
 @app.route("/")
@@ -274,8 +825,39 @@ def home():
 @app.route("/analyze",methods=["POST"])
 def analyze():
     url=request.json["url"]
-    score,status,signals=analyze_site(url)
-    return jsonify({"score":score,"status":status,"signals":signals})
+    return jsonify(inspect_site(url))
+
+@app.route("/analyze/batch", methods=["POST"])
+def analyze_batch():
+    data = request.get_json(silent=True) or {}
+    urls = data.get("urls") if isinstance(data, dict) else data
+    if not isinstance(urls, list) or not urls:
+        return jsonify({"error": "expected {\"urls\": [...]}"}), 400
+    if len(urls) > BATCH_MAX_URLS:
+        return jsonify({"error": f"at most {BATCH_MAX_URLS} urls per batch"}), 400
+    timeout = data.get("timeout", BATCH_TIMEOUT) if isinstance(data, dict) else BATCH_TIMEOUT
+    try:
+        timeout = float(timeout)
+    except (TypeError, ValueError):
+        timeout = -1
+    if not 0 <= timeout < float("inf"):
+        return jsonify({"error": "timeout must be a non-negative number of seconds"}), 400
+    timeout = min(timeout, BATCH_TIMEOUT)
+    t0 = time.perf_counter()
+    results = analyze_many([str(u) for u in urls], timeout)
+    return jsonify({"results": results, "elapsed": round(time.perf_counter() - t0, 3)})
+
+@app.route("/cache/stats")
+def cache_stats():
+    return jsonify(analysis_cache.metrics())
+
+@app.route("/snapshots")
+def snapshot_history():
+    url = request.args.get("url", "")
+    if not url:
+        return jsonify({"error": "expected ?url="}), 400
+    limit = request.args.get("limit", type=int)
+    return jsonify({"url": normalize_url(url), "snapshots": snapshots.history(normalize_url(url), limit)})
 
 @app.route("/chat", methods=["POST"])
 def chat():
@@ -283,26 +865,25 @@ def chat():
     msg=data.get("msg","")
     analysis=data.get("analysis",{})
 
-    prompt=f"""
-You are Marin, a calm, sharp product consultant.
-Explain implications, not metrics.
-you don't give very long replies, you just give the required amount of answer
-
-Score: {analysis.get('score')}
-Status: {analysis.get('status')}
-Signals: {', '.join(analysis.get('signals', []))}
+    job, reply = marin.ask(msg, analysis)
+    if reply is not None:
+        return jsonify({"reply":reply,"job":job})
+    return jsonify({"job":job,"poll":f"/chat/{job}","retry_ms":500}), 202
 
-User question:
-{msg}
-"""
-
-    try:
-        response=model.generate_content(textwrap.dedent(prompt))
-        reply=response.text.strip()
-    except:
-        reply="The concern is not the score itself, but how these signals interfere with the core user journey."
+@app.route("/chat/<job>")
+def chat_poll(job):
+    state, reply = marin.poll(job)
+    if state == "pending":
+        return jsonify({"job":job,"poll":f"/chat/{job}","retry_ms":500}), 202
+    if state == "unknown":
+        return jsonify({"error":"unknown or expired job"}), 404
+    return jsonify({"reply":reply,"job":job})
 
-    return jsonify({"reply":reply})
+@app.route("/chat/stats")
+def chat_stats():
+    return jsonify(marin.metrics())
 
 if __name__=="__main__":
+    if not (os.getenv("GEMINI_API_KEY") or os.getenv("STRUCTURA_FAKE_LLM")):
+        print("GEMINI_API_KEY not set: /analyze works, Marin answers with a fallback reply")
     app.run(debug=True)
@@ -1,9 +1,19 @@
-from flask import Flask, request, render_template_string, send_file, url_for
-import re, math, tldextract, uuid, os
+from flask import Flask, request, send_file, url_for, Response, stream_with_context, jsonify, redirect
+import re, math, uuid, os, io, json, time, threading, gzip, hashlib
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, Counter
+from itertools import islice
 from urllib.parse import urlparse
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
-from datetime import datetime
+from reportlab.lib.utils import ImageReader
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from rulematch import KeywordMatcher, SuffixMatcher
+from rule_store import RuleStore
+import psl_index
+try: import url_features
+except ImportError: url_features=None  # no numpy: batches fall back to the per-URL feature path
 
 IP_RE = re.compile(r'^\d{1,3}(\.\d{1,3}){3}$')
 ENCODING_RE = re.compile(r'%[0-9a-fA-F]{2}')
@@ -15,47 +25,86 @@ RARE_TLDS = {"zip","kim","country","gq","tk","ml","cricket","review"}
 BAD_EXT = {".exe",".scr",".zip",".rar",".msi",".apk"}
 SUSPICIOUS_PORTS = {8080,8888,2087,2096,21,22}
 HOMOGLYPHS = {"а":"a","о":"o","е":"e","с":"c","р":"p","х":"x","і":"i","ԁ":"d","ԃ":"d","ԍ":"g"}
+PARAM_KEYS = ["id=","token=","redirect","auth","session=","email="]
+PATH_KEYS = ["malware","virus","payload","download"]
+FORMAT_FLAWS = ["//","..","\\","??","///"]
+
+PARAM_MATCH = KeywordMatcher(PARAM_KEYS)
+PATH_MATCH = KeywordMatcher(PATH_KEYS)
+FORMAT_MATCH = KeywordMatcher(FORMAT_FLAWS)
+
+# Threat-intel lists: the literals above are the defaults, and any section
+# present in the rules file (see rule_store.py) replaces its default.
+DEFAULT_RULES = {
+    "shorteners":("hash",SHORTENERS),
+    "blocklist":("hash",[]),
+    "rare_tlds":("hash",RARE_TLDS),
+    "test_domains":("list",TEST_DOMAINS),
+    "bad_ext":("list",sorted(BAD_EXT)),
+    "suspicious_ports":("hash",SUSPICIOUS_PORTS),
+    "homoglyphs":("map",HOMOGLYPHS),
+}
+
+def compile_rules(rs):
+    return SimpleNamespace(
+        shorteners=rs.hashset("shorteners"),blocklist=rs.hashset("blocklist"),
+        rare_tlds=rs.hashset("rare_tlds"),ports=rs.hashset("suspicious_ports"),
+        test=KeywordMatcher(rs.strings("test_domains")),ext=SuffixMatcher(rs.strings("bad_ext")),
+        homoglyphs=frozenset(rs.mapping("homoglyphs")))
+
+RULES = RuleStore(os.getenv("URL_RULES_FILE","rules.bin"),DEFAULT_RULES,compile=compile_rules,
+                  interval=float(os.getenv("URL_RULES_POLL","2")))
 
 def entropy(s):
     if not s: return 0
-    f={c:s.count(c) for c in set(s)}
-    return -sum((f[c]/len(s))*math.log2(f[c]/len(s)) for c in f)
+    n=len(s)
+    return -sum((c/n)*math.log2(c/n) for c in Counter(s).values())
 
 def mixed_script(h): return any(ord(c)>127 for c in h)
-def homoglyph_attack(h): return any(c in HOMOGLYPHS for c in h)
-def suspicious_params(q): return any(k in q.lower() for k in ["id=","token=","redirect","auth","session=","email="])
-def bad_path(p): return any(k in p.lower() for k in ["malware","virus","payload","download"])
-def format_quality(u): return "Poor" if any(b in u.lower() for b in ["//","..","\\","??","///"]) else "Normal"
-def is_shortener(h): return h in SHORTENERS
-
-def heuristic_score(url):
-    try:
-        p=urlparse(url); h=p.hostname or ""; path=p.path or ""; q=p.query or ""; port=p.port
+def homoglyph_attack(h,r=None):
+    g=(r or RULES.rules).homoglyphs
+    return any(c in g for c in h)
+def suspicious_params(q): return PARAM_MATCH.search(q.lower())
+def bad_path(p): return PATH_MATCH.search(p.lower())
+def format_quality(u): return "Poor" if FORMAT_MATCH.search(u.lower()) else "Normal"
+def is_shortener(h,r=None): return h in (r or RULES.rules).shorteners
+def is_blocklisted(h,r=None): return bool(h) and (r or RULES.rules).blocklist.domain_match(h)
+
+def split_url(url):
+    p=urlparse(url)
+    return p.hostname or "",p.path or "",p.query or "",p.port
+
+def heuristic_score(url,parts=None,feats=None):
+    # parts: split_url(url) if the caller already has it; feats: precomputed
+    # (entropy, mixed_script, homoglyph) for the host, see batch_features()
+    try: h,path,q,port=parts or split_url(url)
     except: return 95
+    r=RULES.rules
     s=0
     if url.startswith("http://"): s+=15
     if IP_RE.match(h): s+=25
-    if any(t in h for t in TEST_DOMAINS): s+=40
-    ext=tldextract.extract(h)
-    if ext.suffix in RARE_TLDS: s+=14
+    if r.test.search(h): s+=40
+    if is_blocklisted(h,r): s+=40
+    ext=psl_index.extract(h)
+    if ext.suffix in r.rare_tlds: s+=14
     if len(h.split("."))>=5: s+=12
     if "@" in url: s+=20
     if "xn--" in h: s+=20
-    if port in SUSPICIOUS_PORTS: s+=15
+    if port is not None and str(port) in r.ports: s+=15
     if len(h)>60: s+=12
-    if is_shortener(h): s+=20
-    e=entropy(h)
+    if is_shortener(h,r): s+=20
+    if feats is None: feats=(entropy(h),mixed_script(h),homoglyph_attack(h,r))
+    e,mixed,glyph=feats
     if e>4.3: s+=20
     elif e>3.7: s+=12
-    if mixed_script(h): s+=20
-    if homoglyph_attack(h): s+=22
+    if mixed: s+=20
+    if glyph: s+=22
     if suspicious_params(q): s+=18
     if bad_path(path): s+=25
     if ENCODING_RE.search(url): s+=10
     if DOUBLE_ENCODE_RE.search(url): s+=18
     if JS_RE.search(url): s+=16
-    for b in BAD_EXT:
-        if url.lower().endswith(b): s+=30
+    s+=30*r.ext.count(url.lower())
     if format_quality(url)=="Poor": s+=15
     if len(url)>180: s+=12
     elif len(url)>120: s+=7
@@ -69,6 +118,126 @@ def verdict(s):
     if s<=80: return "Risky"
     return "High Danger"
 
+PLAIN_HOST_RE = re.compile(r'^[A-Za-z0-9.-]+$')
+
+def canonical_url(url):
+    # Only rewrites that cannot change the score: surrounding whitespace and
+    # the case of a plain host name (every host rule sees the lowercased
+    # hostname, and lowercasing [A-Za-z0-9.-] cannot create a JS/encoding hit).
+    url=url.strip()
+    if url==url.lower(): return url
+    try: p=urlparse(url)
+    except ValueError: return url
+    user,at,hostport=p.netloc.rpartition("@")
+    host=hostport.split(":",1)[0]
+    if not host or host.islower() or not PLAIN_HOST_RE.match(host): return url
+    i=url.find("//"+p.netloc)+2+len(user)+len(at)
+    return url[:i]+host.lower()+url[i+len(host):]
+
+class VerdictCache:
+    """Bounded LRU of (score, probability, verdict) keyed on canonical URL.
+    Entries expire after ttl seconds; clear() drops everything and makes any
+    result computed before the clear be discarded instead of stored."""
+    def __init__(self,maxsize=10000,ttl=300):
+        self.maxsize,self.ttl=maxsize,ttl
+        self._d=OrderedDict(); self._lock=threading.Lock()
+        self.generation=0
+        self.hits=self.misses=self.evictions=self.expirations=self.flushes=0
+
+    def get(self,key):
+        now=time.monotonic()
+        with self._lock:
+            e=self._d.get(key)
+            if e is None:
+                self.misses+=1; return None
+            if e[0]<=now:
+                del self._d[key]; self.expirations+=1; self.misses+=1; return None
+            self._d.move_to_end(key); self.hits+=1
+            return e[1]
+
+    def put(self,key,value,generation=None):
+        if self.maxsize<=0: return
+        with self._lock:
+            if generation is not None and generation!=self.generation: return
+            self._d[key]=(time.monotonic()+self.ttl,value); self._d.move_to_end(key)
+            while len(self._d)>self.maxsize:
+                self._d.popitem(last=False); self.evictions+=1
+
+    def clear(self):
+        with self._lock:
+            self._d.clear(); self.generation+=1; self.flushes+=1
+
+    def stats(self):
+        with self._lock:
+            n=self.hits+self.misses
+            return {"size":len(self._d),"maxsize":self.maxsize,"ttl":self.ttl,"hits":self.hits,
+                    "misses":self.misses,"hit_rate":round(self.hits/n,4) if n else 0.0,
+                    "evictions":self.evictions,"expirations":self.expirations,"flushes":self.flushes}
+
+VERDICT_CACHE = VerdictCache(int(os.getenv("VERDICT_CACHE_SIZE","10000")),float(os.getenv("VERDICT_CACHE_TTL","300")))
+RULES.on_reload(VERDICT_CACHE.clear)
+
+def scan(url):
+    key=canonical_url(url)
+    r=VERDICT_CACHE.get(key)
+    if r is None:
+        g=VERDICT_CACHE.generation
+        s=heuristic_score(url)
+        r=(s,phishing_probability(s),verdict(s))
+        VERDICT_CACHE.put(key,r,g)
+    return r
+
+def iter_urls(lines):
+    # non-strings from a JSON body pass through; score_batch reports them
+    for l in lines:
+        if not isinstance(l,str): yield l; continue
+        l=l.strip()
+        if l: yield l
+
+def batch_features(hosts):
+    if url_features is None: return [None]*len(hosts)
+    try: x=url_features.extract(hosts,RULES.rules.homoglyphs)
+    except ValueError: return [None]*len(hosts)  # heuristic_score computes them per URL
+    return list(zip(x["entropy"].tolist(),(x["non_ascii"]>0).tolist(),(x["homoglyphs"]>0).tolist()))
+
+def score_batch(urls,chunk=1024):
+    urls=iter(urls)
+    while True:
+        block=list(islice(urls,chunk))
+        if not block: return
+        keys=[canonical_url(u) if isinstance(u,str) else None for u in block]
+        res=[VERDICT_CACHE.get(k) if k is not None else TypeError(f"expected a URL string, got {type(u).__name__}")
+             for u,k in zip(block,keys)]
+        miss=[i for i,r in enumerate(res) if r is None]
+        if miss:
+            g=VERDICT_CACHE.generation
+            parts=[]
+            for i in miss:
+                try: parts.append(split_url(block[i]))
+                except: parts.append(None)
+            feats=batch_features([pt[0] if pt else "" for pt in parts])
+            for i,pt,f in zip(miss,parts,feats):
+                # one bad entry gets an error record instead of ending the stream
+                try: s=heuristic_score(block[i],pt,f) if pt else 95
+                except Exception as e:
+                    res[i]=e; continue
+                res[i]=(s,phishing_probability(s),verdict(s))
+                VERDICT_CACHE.put(keys[i],res[i],g)
+        for u,r in zip(block,res):
+            if isinstance(r,Exception):
+                yield {"url":u,"error":f"{type(r).__name__}: {r}"}
+                continue
+            s,p,v=r
+            yield {"url":u,"score":s,"probability":p,"verdict":v}
+
+def parse_batch_body(req):
+    if req.is_json:
+        d=req.get_json(silent=True)
+        if isinstance(d,dict): d=d.get("urls",[])
+        if not isinstance(d,list): return None
+        return iter_urls(d)
+    return iter_urls(l.decode("utf-8","replace") for l in req.stream)
+
 app = Flask(__name__)
 
 BASE_TEMPLATE = """
@@ -139,9 +308,7 @@ box-shadow:0 10px 30px rgba(0,0,0,0.45);line-height:1.65;font-size:16px}
 
 <body>
 <div class="bg-animation">
-{% for i in range(26) %}
-<div class="particle" style="left:{{ (i*3.6)%100 }}%;animation-delay:{{ i*0.32 }}s"></div>
-{% endfor %}
+{{ particles|safe }}
 </div>
 
 <header>
@@ -206,18 +373,79 @@ e.preventDefault();
 </html>
 """
 
+PARTICLES="\n".join(f'<div class="particle" style="left:{(i*3.6)%100}%;animation-delay:{i*0.32}s"></div>'
+                    for i in range(26))
+TEMPLATE = app.jinja_env.from_string(BASE_TEMPLATE,globals={"particles":PARTICLES})
+
+class FileState:
+    """Tracks whether a file exists (and its mtime) with a polling thread,
+    so request handlers read a flag instead of hitting the filesystem."""
+    def __init__(self,path,interval=2.0):
+        self.path=path; self._listeners=[]
+        self.stamp=self._stat()
+        if interval:
+            threading.Thread(target=self._watch,args=(interval,),daemon=True).start()
+
+    def _stat(self):
+        try: return os.stat(self.path).st_mtime_ns
+        except OSError: return None
+
+    @property
+    def exists(self): return self.stamp is not None
+
+    def on_change(self,fn): self._listeners.append(fn)
+
+    def refresh(self):
+        st=self._stat()
+        if st==self.stamp: return False
+        self.stamp=st
+        for fn in self._listeners: fn()
+        return True
+
+    def _watch(self,interval):
+        while True:
+            time.sleep(interval); self.refresh()
+
+LOGO_PATH=os.path.join("static","logo.png")
+LOGO = FileState(LOGO_PATH,float(os.getenv("LOGO_POLL","2")))
+
+def render_page(title,body,show_top=False):
+    ctx={"title":title,"body":body,"show_top":show_top,"logo_exists":LOGO.exists,
+         "logo_url":url_for('static',filename='logo.png') if LOGO.exists else ""}
+    app.update_template_context(ctx)
+    return TEMPLATE.render(ctx)
+
+_page_cache={}
+
+def serve_static_page(name,title,body):
+    # Rendered once (and again only when the logo changes), then served with
+    # validators so repeat visits get a 304 and gzip-capable clients the
+    # precompressed body.
+    e=_page_cache.get(name)
+    if e is None:
+        html=render_page(title,body).encode("utf-8")
+        e=(html,gzip.compress(html,9),hashlib.sha1(html).hexdigest(),datetime.now(timezone.utc).replace(microsecond=0))
+        _page_cache[name]=e
+    html,gz,tag,modified=e
+    use_gz=request.accept_encodings["gzip"]>0
+    resp=Response(gz if use_gz else html,mimetype="text/html")
+    if use_gz: resp.headers["Content-Encoding"]="gzip"
+    resp.vary.add("Accept-Encoding")
+    resp.set_etag(tag+("-gz" if use_gz else ""))
+    resp.last_modified=modified
+    resp.cache_control.no_cache=True
+    return resp.make_conditional(request)
+
+LOGO.on_change(_page_cache.clear)
+
 @app.route("/",methods=["GET","POST"])
 def home():
-    logo_exists=os.path.exists(os.path.join("static","logo.png"))
-    logo_url=url_for('static',filename='logo.png') if logo_exists else ""
     result_html=""
 
     if request.method=="POST":
         url=request.form.get("url","").strip()
         if url:
-            s=heuristic_score(url)
-            p=phishing_probability(s)
-            v=verdict(s)
+            s,p,v=scan(url)
             cc="safe" if v in ["Safe","Low Risk"] else "suspicious" if v=="Suspicious" else "danger"
             cid=uuid.uuid4().hex[:12].upper()
             ts=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -236,22 +464,33 @@ def home():
             """
 
     body=f"<div>{result_html}</div>"
-    return render_template_string(BASE_TEMPLATE,title="URL Threat Detector",body=body,
-                                  logo_exists=logo_exists,logo_url=logo_url,show_top=True)
+    return render_page("URL Threat Detector",body,show_top=True)
 
-@app.route("/download_report")
-def download_report():
-    url=request.args.get("u","")
-    s=request.args.get("s","")
-    p=request.args.get("p","")
-    v=request.args.get("v","")
-    cid=request.args.get("cid",uuid.uuid4().hex[:12].upper())
-    ts=request.args.get("ts",datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-    fn=f"report_{cid}.pdf"
-    c=canvas.Canvas(fn,pagesize=A4)
+_logo=None; _logo_lock=threading.Lock()
+
+def logo_image():
+    # Decoded once, then shared by every report; False marks "no usable logo".
+    global _logo
+    if _logo is None:
+        with _logo_lock:
+            if _logo is None:
+                try: _logo=ImageReader(LOGO_PATH) if LOGO.exists else False
+                except Exception: _logo=False
+    return _logo or None
+
+def _reset_logo():
+    global _logo
+    with _logo_lock: _logo=None
+
+LOGO.on_change(_reset_logo)
+
+def render_report(url,s,p,v,cid,ts):
+    buf=io.BytesIO()
+    c=canvas.Canvas(buf,pagesize=A4)
     w,h=A4
-    if os.path.exists(os.path.join("static","logo.png")):
-        try: c.drawImage(os.path.join("static","logo.png"),(w-140)/2,h-100,width=140,height=70)
+    logo=logo_image()
+    if logo:
+        try: c.drawImage(logo,(w-140)/2,h-100,width=140,height=70)
         except: pass
     c.setFont("Helvetica-Bold",16)
     c.drawCentredString(w/2,h-130,"FORENSIC URL THREAT ANALYSIS REPORT")
@@ -264,23 +503,114 @@ def download_report():
     c.drawString(60,h-240,f"Probability: {p}%")
     c.drawString(60,h-260,f"Verdict: {v}")
     c.save()
-    return send_file(fn,as_attachment=True)
+    return buf.getvalue()
+
+class ReportStore:
+    """Finished PDFs by case ID, LRU-evicted once their total size passes max_bytes."""
+    def __init__(self,max_bytes=32*1024*1024):
+        self.max_bytes=max_bytes; self.size=0; self.evictions=0
+        self._d=OrderedDict(); self._lock=threading.Lock()
+
+    def get(self,cid):
+        with self._lock:
+            pdf=self._d.get(cid)
+            if pdf is not None: self._d.move_to_end(cid)
+            return pdf
+
+    def put(self,cid,pdf):
+        with self._lock:
+            old=self._d.pop(cid,None)
+            if old is not None: self.size-=len(old)
+            self._d[cid]=pdf; self.size+=len(pdf)
+            while self.size>self.max_bytes and len(self._d)>1:
+                _,ev=self._d.popitem(last=False); self.size-=len(ev); self.evictions+=1
+
+REPORTS = ReportStore(int(os.getenv("REPORT_CACHE_BYTES",str(32*1024*1024))))
+REPORT_POOL = ThreadPoolExecutor(max_workers=int(os.getenv("REPORT_WORKERS","2")),thread_name_prefix="report")
+_report_jobs={}; _report_jobs_lock=threading.Lock()
+
+def _build_report(args):
+    REPORTS.put(args[4],render_report(*args))
+    with _report_jobs_lock: _report_jobs.pop(args[4],None)
+
+def submit_report(url,s,p,v,cid,ts):
+    """Queue a report unless it is cached or already being built."""
+    with _report_jobs_lock:
+        f=_report_jobs.get(cid)
+        if REPORTS.get(cid) is not None or (f is not None and not f.done()): return
+        _report_jobs[cid]=REPORT_POOL.submit(_build_report,(url,s,p,v,cid,ts))
+
+def report_state(cid):
+    if REPORTS.get(cid) is not None: return "ready"
+    with _report_jobs_lock: f=_report_jobs.get(cid)
+    if f is None: return "ready" if REPORTS.get(cid) is not None else "unknown"
+    if f.done(): return "failed" if f.exception() else "ready"
+    return "running" if f.running() else "queued"
+
+@app.route("/download_report")
+def download_report():
+    if not request.args.get("cid"):
+        # the 202 page reloads its own URL, so the case id has to be in it
+        args=request.args.to_dict()
+        args["cid"]=uuid.uuid4().hex[:12].upper()
+        args.setdefault("ts",datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        return redirect(url_for("download_report",**args))
+    url=request.args.get("u","")
+    s=request.args.get("s","")
+    p=request.args.get("p","")
+    v=request.args.get("v","")
+    cid=request.args["cid"]
+    ts=request.args.get("ts",datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    pdf=REPORTS.get(cid)
+    if pdf is not None:
+        return send_file(io.BytesIO(pdf),mimetype="application/pdf",as_attachment=True,
+                         download_name=f"report_{cid}.pdf")
+    if report_state(cid)=="failed":
+        with _report_jobs_lock: _report_jobs.pop(cid,None)  # next click retries
+        return "Report generation failed",500
+    submit_report(url,s,p,v,cid,ts)
+    body=f"""<p>Preparing forensic report for case {cid}&hellip;</p>
+    <script>setTimeout(()=>location.reload(),800)</script>"""
+    return render_page("Preparing Report",body),202
+
+@app.route("/report_status/<cid>")
+def report_status(cid):
+    st=report_state(cid)
+    d={"cid":cid,"state":st}
+    if st=="ready": d["download"]=url_for("download_report",cid=cid)
+    return jsonify(d),(404 if st=="unknown" else 200)
+
+@app.route("/api/scan/batch",methods=["POST"])
+def scan_batch():
+    urls=parse_batch_body(request)
+    if urls is None:
+        return Response(json.dumps({"error":"expected a JSON array of URLs or newline-delimited text"})+"\n",
+                        status=400,mimetype="application/json")
+
+    def gen():
+        n=0; t0=time.perf_counter()
+        for r in score_batch(urls):
+            n+=1
+            yield json.dumps(r)+"\n"
+        el=time.perf_counter()-t0
+        yield json.dumps({"summary":{"count":n,"elapsed_sec":round(el,6),
+                                     "urls_per_sec":round(n/el,1) if el>0 else None}})+"\n"
+
+    return Response(stream_with_context(gen()),mimetype="application/x-ndjson")
+
+@app.route("/api/cache/stats")
+def cache_stats():
+    return jsonify(VERDICT_CACHE.stats())
 
 @app.route("/about")
 def about():
     body="<p>The Forensic URL Threat Detector performs multi-layered heuristic analysis to identify malicious URLs.</p>"
-    return render_template_string(BASE_TEMPLATE,title="About",body=body,
-                                  logo_exists=os.path.exists("static/logo.png"),
-                                  logo_url=url_for('static',filename='logo.png'),
-                                  show_top=False)
+    return serve_static_page("about","About",body)
 
 @app.route("/features")
 def features():
     body="<ul><li>Heuristic scoring</li><li>Homoglyph checks</li><li>Encoding detection</li><li>Forensic PDF reports</li></ul>"
-    return render_template_string(BASE_TEMPLATE,title="Features",body=body,
-                                  logo_exists=os.path.exists("static/logo.png"),
-                                  logo_url=url_for('static',filename='logo.png'),
-                                  show_top=False)
+    return serve_static_page("features","Features",body)
 
 @app.route("/rules")
 def rules():
@@ -292,6 +622,7 @@ def rules():
     <li>Flags rare TLDs.</li>
     <li>Searches for suspicious keywords.</li>
     <li>Detects malware domain tokens.</li>
+    <li>Matches threat-intel domain blocklists.</li>
     <li>Counts subdomain layers.</li>
     <li>Checks '@' in URLs.</li>
     <li>Detects punycode.</li>
@@ -307,10 +638,7 @@ def rules():
     <li>Computes entropy.</li>
     <li>Evaluates formatting.</li>
     </ol></div>"""
-    return render_template_string(BASE_TEMPLATE,title="Rules",body=body,
-                                  logo_exists=os.path.exists("static/logo.png"),
-                                  logo_url=url_for('static',filename='logo.png'),
-                                  show_top=False)
+    return serve_static_page("rules","Rules",body)
 
 @app.route("/contact")
 def contact():
@@ -327,10 +655,7 @@ def contact():
     <li>Hansika</li>
     </ul>
     """
-    return render_template_string(BASE_TEMPLATE,title="Contact",body=body,
-                                  logo_exists=os.path.exists("static/logo.png"),
-                                  logo_url=url_for('static',filename='logo.png'),
-                                  show_top=False)
+    return serve_static_page("contact","Contact",body)
 
 if __name__=="__main__":
     app.run(debug=True)
@@ -1,45 +1,605 @@
-import requests
-from bs4 import BeautifulSoup
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import random
+import re
+import signal
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+from array import array
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as BudgetExceeded
 from datetime import datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
 from colorama import Fore, Style, init
 
+import fastparse
+
 # Initialize colorama
 init(autoreset=True)
 
-url = "https://www.bbc.com"
+HERE = os.path.dirname(os.path.abspath(__file__))
+FEEDS_FILE = os.getenv("SCRAPER_FEEDS", os.path.join(HERE, "scraper_feeds.json"))
+DEFAULT_FEEDS = [{"name": "BBC", "url": "https://www.bbc.com", "selector": "h2"}]
 
-try:
-    response = requests.get(url, timeout=10)
-    response.encoding = "utf-8"
-    soup = BeautifulSoup(response.text, "html.parser")
+WORKERS = 16
+POOL_SIZE = 32
+BUDGET = 20.0           # seconds for one full aggregation cycle
+REQUEST_TIMEOUT = 10.0
+DOMAIN_INTERVAL = 1.0   # minimum seconds between two requests to one host
 
-    raw_headlines = soup.find_all("h2")
-    headlines = []
+STATE_DB = os.getenv("SCRAPER_STATE_DB", "scraper_state.sqlite3")
+CACHE_DIR = os.getenv("SCRAPER_CACHE_DIR", "scraper_cache")
+SEEN_MAX_AGE = 14 * 24 * 3600   # forget headlines not seen again for this long
+NEAR_DUP_THRESHOLD = 0.8        # estimated Jaccard similarity of 4-gram shingles
+MINHASH_PERMS = 64
+MINHASH_BANDS = 16              # 16 bands x 4 rows
 
-    for h in raw_headlines:
-        text = h.get_text(strip=True)
-        if text and text not in headlines:
-            headlines.append(text)
+DAEMON_INTERVAL = 300.0         # seconds between cycles in --daemon mode
+DAEMON_JITTER = 0.2             # +/- fraction applied to every sleep
+MAX_BACKOFF = 6 * 3600.0        # cap on how long a failing source is skipped
 
-    if not headlines:
-        print(Fore.RED + "⚠ No headlines found — site structure may have changed.")
+_local = threading.local()
+
+
+def http_session():
+    # One keep-alive session per worker thread, reused across cycles.
+    s = getattr(_local, "session", None)
+    if s is None:
+        s = requests.Session()
+        s.headers["User-Agent"] = "Mozilla/5.0"
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+        s.mount("http://", adapter)
+        s.mount("https://", adapter)
+        _local.session = s
+    return s
+
+
+class DomainThrottle:
+    """Hands out request slots per host at least ``interval`` seconds apart,
+    so feeds sharing a site never hit it in a burst."""
+
+    def __init__(self):
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url, interval, deadline):
+        host = urlparse(url).hostname or ""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, 0.0))
+            if slot >= deadline:
+                raise BudgetExceeded(f"no slot for {host} within the budget")
+            self._next[host] = slot + interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+throttle = DomainThrottle()
+
+
+def load_feeds(path=FEEDS_FILE):
+    """Feed list: [{"name", "url", "selector", "min_length"?, "interval"?}]."""
+    if not os.path.exists(path):
+        return DEFAULT_FEEDS
+    with open(path, encoding="utf-8") as f:
+        feeds = json.load(f)
+    for feed in feeds:
+        if "url" not in feed:
+            raise ValueError(f"feed without url: {feed!r}")
+        feed.setdefault("name", urlparse(feed["url"]).hostname)
+        feed.setdefault("selector", "h2")
+    return feeds
+
+
+def parse_headlines(html, feed):
+    # fastparse picks the quickest installed parser and only extracts the
+    # elements the feed's selector names.
+    min_length = feed.get("min_length", 1)
+    return [text for text in fastparse.select_text(html, feed["selector"]) if len(text) >= min_length]
+
+
+PUNCT_RE = re.compile(r"[^\w\s]")
+
+
+def normalize_headline(text):
+    # Case, punctuation, accents-as-compatibility-forms and spacing differ
+    # between sites for the same story.
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return " ".join(PUNCT_RE.sub(" ", text).split())
+
+
+def hash64(data):
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big", signed=True)
+
+
+def headline_key(text):
+    return hash64(normalize_headline(text).encode("utf-8"))
+
+
+_MERSENNE = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+PERMUTATIONS = [(_rng.randrange(1, _MERSENNE), _rng.randrange(_MERSENNE)) for _ in range(MINHASH_PERMS)]
+
+
+def minhash(norm):
+    """MinHash signature of the character 4-gram shingles of ``norm``."""
+    grams = {norm[i:i + 4] for i in range(max(1, len(norm) - 3))}
+    hashed = [hash64(g.encode("utf-8")) & _MERSENNE for g in grams]
+    return [min((a * h + b) % _MERSENNE for h in hashed) for a, b in PERMUTATIONS]
+
+
+def lsh_buckets(signature):
+    rows = MINHASH_PERMS // MINHASH_BANDS
+    return [hash64(bytes([band]) + array("Q", signature[band * rows:(band + 1) * rows]).tobytes())
+            for band in range(MINHASH_BANDS)]
+
+
+class SeenStore:
+    """Headlines already reported, keyed by a 64-bit hash of the normalized
+    text and kept in SQLite so later runs only emit what is new. A headline
+    seen again refreshes its last_seen; rows idle for ``max_age`` seconds
+    are evicted on open. With ``near_dup``, MinHash signatures are indexed
+    by LSH band so reworded copies of a known story are dropped as well.
+    Headlines recorded during a run only stick if close() is told they
+    were shown."""
+
+    def __init__(self, path, max_age=SEEN_MAX_AGE, near_dup=False, threshold=NEAR_DUP_THRESHOLD):
+        self.near_dup, self.threshold = near_dup, threshold
+        self.db = sqlite3.connect(path)
+        self.db.execute("""CREATE TABLE IF NOT EXISTS seen(
+            key INTEGER PRIMARY KEY, headline TEXT NOT NULL, source TEXT,
+            first_seen REAL NOT NULL, last_seen REAL NOT NULL, signature BLOB)""")
+        self.db.execute("CREATE TABLE IF NOT EXISTS seen_bands(bucket INTEGER NOT NULL, key INTEGER NOT NULL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS seen_bands_bucket ON seen_bands(bucket)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS seen_last ON seen(last_seen)")
+        cutoff = time.time() - max_age
+        self.db.execute("DELETE FROM seen_bands WHERE key IN (SELECT key FROM seen WHERE last_seen < ?)", (cutoff,))
+        self.evicted = self.db.execute("DELETE FROM seen WHERE last_seen < ?", (cutoff,)).rowcount
+        self.db.commit()
+        self.stats = dict.fromkeys(("new", "repeats", "near_dups"), 0)
+        self.added = set()
+
+    def _similar(self, buckets, signature):
+        marks = ",".join("?" * len(buckets))
+        for (blob,) in self.db.execute(f"""SELECT signature FROM seen WHERE key IN
+                (SELECT DISTINCT key FROM seen_bands WHERE bucket IN ({marks}))""", buckets):
+            if blob:
+                other = array("Q", blob)
+                same = sum(x == y for x, y in zip(signature, other))
+                if same / MINHASH_PERMS >= self.threshold:
+                    return True
+        return False
+
+    def check(self, text, source=None):
+        """True if ``text`` has not been reported before; records it either way."""
+        now = time.time()
+        norm = normalize_headline(text)
+        key = hash64(norm.encode("utf-8"))
+        if self.db.execute("UPDATE seen SET last_seen=? WHERE key=?", (now, key)).rowcount:
+            self.stats["repeats"] += 1
+            return False
+        signature = buckets = None
+        if self.near_dup:
+            signature = minhash(norm)
+            buckets = lsh_buckets(signature)
+            near = self._similar(buckets, signature)
+        self.db.execute("INSERT INTO seen VALUES (?,?,?,?,?,?)", (key, text, source, now, now,
+                        array("Q", signature).tobytes() if signature else None))
+        if buckets:
+            self.db.executemany("INSERT INTO seen_bands VALUES (?,?)", [(b, key) for b in buckets])
+        self.added.add(key)
+        if self.near_dup and near:
+            self.stats["near_dups"] += 1
+            return False
+        self.stats["new"] += 1
+        return True
+
+    def close(self, shown=None):
+        """Commit the run. With ``shown``, headlines first recorded in this
+        run but not among them are forgotten again, so a later run can
+        still report them."""
+        if shown is not None:
+            drop = [(key,) for key in self.added - {headline_key(text) for text in shown}]
+            self.db.executemany("DELETE FROM seen_bands WHERE key=?", drop)
+            self.db.executemany("DELETE FROM seen WHERE key=?", drop)
+        self.db.commit()
+        self.db.close()
+
+
+class HttpCache:
+    """On-disk cache of feed pages: per URL a JSON entry (validators, body
+    SHA-256 and size, the selector used and the headlines it produced) and
+    the gzipped body. Lets fetch_feed send conditional requests and skip
+    parsing when the server answers 304 or the body hashes the same; the
+    stored body is only parsed again if the feed's selector changed."""
+
+    def __init__(self, directory=CACHE_DIR):
+        self.dir = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.stats = dict.fromkeys(("requests", "not_modified", "unchanged", "parsed",
+                                    "bytes_downloaded", "bytes_saved"), 0)
+
+    def _path(self, url, ext):
+        return os.path.join(self.dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ext)
+
+    def count(self, **deltas):
+        with self._lock:
+            for k, v in deltas.items():
+                self.stats[k] += v
+
+    def load(self, url):
+        try:
+            with open(self._path(url, ".json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def body(self, url):
+        with gzip.open(self._path(url, ".body.gz"), "rb") as f:
+            return f.read()
+
+    def _write(self, path, data, opener=open):
+        tmp = f"{path}.tmp{threading.get_ident()}"
+        with opener(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def store(self, url, entry, body=None):
+        if body is not None:
+            self._write(self._path(url, ".body.gz"), body, gzip.open)
+        self._write(self._path(url, ".json"), json.dumps(entry).encode("utf-8"))
+
+    def report(self):
+        m = dict(self.stats)
+        hits = m["not_modified"] + m["unchanged"]
+        m["hit_rate"] = round(hits / m["requests"], 4) if m["requests"] else 0.0
+        return m
+
+
+def conditional_headers(entry):
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def fetch_feed(feed, deadline, cache=None):
+    throttle.wait(feed["url"], feed.get("interval", DOMAIN_INTERVAL), deadline)
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise BudgetExceeded("budget spent waiting for a slot")
+    url = feed["url"]
+    entry = cache.load(url) if cache else None
+    response = http_session().get(url, timeout=min(REQUEST_TIMEOUT, remaining), headers=conditional_headers(entry))
+    if cache:
+        cache.count(requests=1, bytes_downloaded=len(response.content))
+    same_rules = entry and entry["selector"] == feed["selector"] and entry.get("min_length") == feed.get("min_length")
+
+    if entry and response.status_code == 304:
+        cache.count(not_modified=1, bytes_saved=entry["size"])
+        if same_rules:
+            return entry["headlines"]
+        body, digest = cache.body(url), entry["sha256"]
     else:
+        response.raise_for_status()
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        if entry and same_rules and digest == entry["sha256"]:
+            # No validators honoured, but the page is byte-for-byte the same.
+            cache.count(unchanged=1)
+            entry.update(etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified"))
+            cache.store(url, entry)
+            return entry["headlines"]
+
+    headlines = parse_headlines(body.decode("utf-8", errors="replace"), feed)
+    if cache:
+        cache.count(parsed=1)
+        fresh = response.status_code != 304
+        cache.store(url, {
+            "url": url, "sha256": digest, "size": len(body), "stored": time.time(),
+            "etag": response.headers.get("ETag") if fresh else entry.get("etag"),
+            "last_modified": response.headers.get("Last-Modified") if fresh else entry.get("last_modified"),
+            "selector": feed["selector"], "min_length": feed.get("min_length"), "headlines": headlines,
+        }, body if fresh else None)
+    return headlines
+
+
+def aggregate(feeds, budget=BUDGET, workers=WORKERS, status=None, is_new=None, cache=None):
+    """Fetch every feed concurrently and yield (source, headline) pairs,
+    deduplicated, as each source finishes. Sources still running when the
+    ``budget`` runs out are abandoned. Per-source outcomes go into ``status``
+    ({name: "ok: N" | "error: ..." | "timeout"}). ``is_new(text, source)``
+    replaces the default in-run dedup on normalized-text hashes; with an
+    HttpCache, unchanged pages are neither downloaded nor parsed again."""
+    status = {} if status is None else status
+    deadline = time.monotonic() + budget
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="feed")
+    futures = {pool.submit(fetch_feed, feed, deadline, cache): feed for feed in feeds}
+    if is_new is None:
+        seen = set()
+
+        def is_new(text, source):
+            key = headline_key(text)
+            if key in seen:
+                return False
+            seen.add(key)
+            return True
+
+    try:
+        for future in as_completed(futures, timeout=budget):
+            feed = futures[future]
+            try:
+                headlines = future.result()
+            except BudgetExceeded:
+                status[feed["name"]] = "timeout"
+                continue
+            except Exception as e:  # one broken source must not sink the cycle
+                status[feed["name"]] = f"error: {e}"
+                continue
+            status[feed["name"]] = f"ok: {len(headlines)}"
+            for text in headlines:
+                if is_new(text, feed["name"]):
+                    yield feed["name"], text
+    except BudgetExceeded:
+        for future, feed in futures.items():
+            if not future.done():
+                future.cancel()
+                status[feed["name"]] = "timeout"
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+class HeadlineStore:
+    """Every reported headline, in SQLite with an FTS5 index over the text
+    (kept in sync by triggers), so months of history can be searched in
+    milliseconds. Rows are buffered and written one transaction per batch."""
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS headlines(
+                id INTEGER PRIMARY KEY, headline TEXT NOT NULL, source TEXT, url TEXT, seen REAL NOT NULL);
+            CREATE INDEX IF NOT EXISTS headlines_seen ON headlines(seen);
+            CREATE INDEX IF NOT EXISTS headlines_source ON headlines(source, seen);
+            CREATE VIRTUAL TABLE IF NOT EXISTS headlines_fts
+                USING fts5(headline, content='headlines', content_rowid='id');
+            CREATE TRIGGER IF NOT EXISTS headlines_ai AFTER INSERT ON headlines BEGIN
+                INSERT INTO headlines_fts(rowid, headline) VALUES (new.id, new.headline);
+            END;
+            CREATE TRIGGER IF NOT EXISTS headlines_ad AFTER DELETE ON headlines BEGIN
+                INSERT INTO headlines_fts(headlines_fts, rowid, headline) VALUES ('delete', old.id, old.headline);
+            END;
+        """)
+        self.pending = []
+
+    def add(self, headline, source=None, url=None):
+        self.pending.append((headline, source, url, time.time()))
+        if len(self.pending) >= 1000:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            with self.db:
+                self.db.executemany("INSERT INTO headlines(headline, source, url, seen) VALUES (?,?,?,?)",
+                                    self.pending)
+            self.pending.clear()
+
+    def search(self, query=None, source=None, since=None, limit=20, rank=False):
+        """Newest first (or best bm25 match with ``rank``) headlines matching
+        the FTS5 ``query``, optionally limited to a source and a start time."""
+        if query:
+            sql = ("SELECT h.seen, h.source, h.headline FROM headlines_fts "
+                   "JOIN headlines h ON h.id = headlines_fts.rowid")
+            where, params = ["headlines_fts MATCH ?"], [query]
+        else:
+            sql = "SELECT h.seen, h.source, h.headline FROM headlines h"
+            where, params = [], []
+        if source:
+            where.append("h.source = ?")
+            params.append(source)
+        if since:
+            where.append("h.seen >= ?")
+            params.append(since)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        # Ids grow with insertion time, and FTS5 can walk rowids backwards.
+        sql += " ORDER BY " + ("bm25(headlines_fts)" if rank and query else "h.id DESC")
+        return self.db.execute(sql + " LIMIT ?", params + [limit]).fetchall()
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+
+def run_cycle(args, feeds):
+    """One aggregation pass; returns (headlines, status, cache report or
+    None, SeenStore or None, seconds). The SeenStore is left open for
+    publish() to record which of the headlines were actually shown."""
+    t0 = time.perf_counter()
+    status = {}
+    store = None if args.all else SeenStore(args.state, args.forget_after * 86400, args.near_dup)
+    cache = None if args.no_cache else HttpCache(args.cache_dir)
+    try:
+        headlines = list(aggregate(feeds, args.budget, args.workers, status, store and store.check, cache))
+    except BaseException:
+        if store:
+            store.db.close()  # nothing was shown: roll the run back
+        raise
+    return headlines, status, cache and cache.report(), store, time.perf_counter() - t0
+
+
+def publish(args, feeds, store, shown):
+    """Mark the ``shown`` (source, headline) pairs as seen and archive them
+    in the HeadlineStore; anything new that was not shown stays unseen."""
+    if store is None:
+        return
+    store.close([text for _, text in shown])
+    if shown:
+        urls = {feed["name"]: feed["url"] for feed in feeds}
+        archive = HeadlineStore(args.state)
+        for source, text in shown:
+            archive.add(text, source, urls.get(source))
+        archive.close()
+
+
+def backoff_delay(failures, interval):
+    return min(MAX_BACKOFF, interval * 2 ** failures) * random.uniform(1 - DAEMON_JITTER, 1 + DAEMON_JITTER)
+
+
+def run_daemon(args, feeds):
+    """Run cycles forever, sleeping a jittered --interval between them. A
+    source that errors or times out is skipped for an exponentially growing,
+    jittered backoff (capped at MAX_BACKOFF) until it succeeds again."""
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+    failures, resume = {}, {}
+    cycle = 0
+    while not stop.is_set():
+        cycle += 1
+        now = time.monotonic()
+        due = [f for f in feeds if resume.get(f["name"], 0) <= now]
+        headlines, status, cache, store, elapsed = run_cycle(args, due)
+        publish(args, due, store, headlines)
+        for name, outcome in status.items():
+            if outcome.startswith("ok"):
+                failures.pop(name, None)
+                resume.pop(name, None)
+            else:
+                failures[name] = failures.get(name, 0) + 1
+                resume[name] = time.monotonic() + backoff_delay(failures[name], args.interval)
+        errors = sum(not o.startswith("ok") for o in status.values())
+        line = (f"[{datetime.now():%Y-%m-%d %H:%M:%S}] cycle {cycle}: {len(headlines)} new from "
+                f"{len(due)}/{len(feeds)} sources, {errors} failed, {elapsed:.1f}s")
+        if cache:
+            line += f", cache hit {cache['hit_rate']:.0%}, {cache['bytes_saved'] / 1024:,.0f} KB saved"
+        print(line, flush=True)
+        stop.wait(args.interval * random.uniform(1 - DAEMON_JITTER, 1 + DAEMON_JITTER))
+
+
+def parse_since(text):
+    """"30d", "12h", "45m" or an ISO date -> epoch seconds."""
+    units = {"d": 86400, "h": 3600, "m": 60}
+    if text[-1:] in units and text[:-1].replace(".", "", 1).isdigit():
+        return time.time() - float(text[:-1]) * units[text[-1]]
+    return datetime.fromisoformat(text).timestamp()
+
+
+def run_search(args):
+    store = HeadlineStore(args.state)
+    t0 = time.perf_counter()
+    try:
+        rows = store.search(args.search or None, args.source, args.since and parse_since(args.since),
+                            args.limit, args.rank)
+    except sqlite3.OperationalError as e:
+        sys.exit(Fore.RED + f" Bad search query: {e}")
+    finally:
+        store.close()
+    took = (time.perf_counter() - t0) * 1000
+    for seen, source, headline in rows:
+        print(Fore.CYAN + f"{datetime.fromtimestamp(seen):%Y-%m-%d %H:%M}  " + Style.RESET_ALL + headline
+              + Fore.MAGENTA + f"  [{source}]")
+    print(Fore.YELLOW + f"\n{len(rows)} results in {took:.1f} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Concurrent headline aggregator.")
+    ap.add_argument("--feeds", default=FEEDS_FILE, help="JSON feed list (default: scraper_feeds.json)")
+    ap.add_argument("-n", "--count", type=int, help="headlines to show and save (asked if omitted)")
+    ap.add_argument("--budget", type=float, default=BUDGET, help="seconds allowed for the whole cycle")
+    ap.add_argument("--workers", type=int, default=WORKERS, help="sources fetched at once")
+    ap.add_argument("--state", default=STATE_DB, help="SQLite file remembering headlines already reported")
+    ap.add_argument("--forget-after", type=float, default=SEEN_MAX_AGE / 86400,
+                    help="days after which an unseen headline may be reported again")
+    ap.add_argument("--near-dup", action="store_true", help="also drop reworded copies of known headlines (MinHash)")
+    ap.add_argument("--all", action="store_true", help="ignore the history and show every headline")
+    ap.add_argument("--cache-dir", default=CACHE_DIR, help="on-disk HTTP cache for feed pages")
+    ap.add_argument("--no-cache", action="store_true", help="always download and parse every page")
+    ap.add_argument("--txt", action="store_true", help="also save the shown headlines to a headlines_<time>.txt")
+    d = ap.add_argument_group("daemon")
+    d.add_argument("--daemon", action="store_true", help="keep aggregating on a schedule until interrupted")
+    d.add_argument("--interval", type=float, default=DAEMON_INTERVAL, help="seconds between cycles (jittered)")
+    q = ap.add_argument_group("search the stored headlines")
+    q.add_argument("--search", metavar="QUERY", nargs="?", const="",
+                   help='FTS5 query, e.g. "storm AND coast" or "elect*" (empty: latest)')
+    q.add_argument("--source", help="only this feed name")
+    q.add_argument("--since", help='"30d", "12h" or an ISO date')
+    q.add_argument("--limit", type=int, default=20)
+    q.add_argument("--rank", action="store_true", help="order by relevance instead of newest first")
+    args = ap.parse_args()
+
+    if args.search is not None:
+        return run_search(args)
+    try:
+        feeds = load_feeds(args.feeds)
+    except (OSError, ValueError) as e:
+        sys.exit(Fore.RED + f" Bad feed list: {e}")
+    if args.daemon:
+        if args.all:
+            sys.exit(Fore.RED + " --daemon needs the seen history; drop --all")
+        return run_daemon(args, feeds)
+
+    headlines, status, m, store, elapsed = run_cycle(args, feeds)
+
+    for name, outcome in status.items():
+        if not outcome.startswith("ok"):
+            print(Fore.RED + f"⚠ {name}: {outcome}")
+
+    if m:
+        print(Fore.YELLOW + f"HTTP cache: {m['requests']} requests, {m['not_modified']} not modified, "
+              f"{m['unchanged']} unchanged, hit rate {m['hit_rate']:.0%}, {m['parsed']} parsed, "
+              f"{m['bytes_downloaded'] / 1024:,.0f} KB downloaded, {m['bytes_saved'] / 1024:,.0f} KB saved")
+    if store:
+        counts = store.stats
+        print(Fore.YELLOW + f"{counts['new']} new, {counts['repeats']} already seen, "
+              f"{counts['near_dups']} near-duplicates"
+              + (f", {store.evicted} expired from history" if store.evicted else ""))
+    if not headlines:
+        publish(args, feeds, store, [])
+        if store and (store.stats["repeats"] or store.stats["near_dups"]):
+            print(Fore.GREEN + "No new headlines since the last run.")
+        else:
+            print(Fore.RED + "⚠ No headlines found — site structure may have changed.")
+        return
+
+    count = args.count
+    if count is None:
         try:
             count = int(input("How many headlines do you want? "))
         except ValueError:
             count = 10
+    shown = headlines[:max(0, count)]
 
-        print(Fore.YELLOW + "\nLatest Headlines:\n" + Style.RESET_ALL)
-        for i, headline in enumerate(headlines[:count], start=1):
-            print(Fore.CYAN + f"{i}. " + Style.RESET_ALL + headline)
+    print(Fore.YELLOW + f"\n{'Latest' if args.all else 'New'} Headlines "
+          f"({len(headlines)} from {len(feeds)} sources in {elapsed:.1f}s):\n" + Style.RESET_ALL)
+    for i, (source, headline) in enumerate(shown, start=1):
+        print(Fore.CYAN + f"{i}. " + Style.RESET_ALL + headline + Fore.MAGENTA + f"  [{source}]")
 
+    # Only what was shown counts as seen; the rest is reported next run.
+    publish(args, feeds, store, shown)
+    if store:
+        print(Fore.GREEN + f"\n {len(shown)} headlines stored in '{args.state}' (search with --search)")
+        if len(shown) < len(headlines):
+            print(Fore.GREEN + f" {len(headlines) - len(shown)} more left for the next run")
+    if args.txt or not store:
         filename = f"headlines_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.txt"
         with open(filename, "w", encoding="utf-8") as file:
-            for headline in headlines[:count]:
-                file.write(headline + "\n")
-
+            for source, headline in shown:
+                file.write(f"{headline}\t{source}\n")
         print(Fore.GREEN + f"\n Headlines saved to '{filename}'")
 
-except requests.RequestException as e:
-    print(Fore.RED + f" Network error: {e}")
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""Shared HTML extraction with the fastest parser available.
+
+select_text(html, selector) returns the stripped text of every element
+matching a CSS selector, using the first backend that is installed:
+
+    selectolax   Lexbor/Modest C parser with native CSS
+    lxml         libxml2 parser; the selector is translated to XPath
+    strainer     BeautifulSoup that only builds the selected tags (SoupStrainer)
+    html.parser  plain BeautifulSoup, the reference behaviour
+
+FASTPARSE_BACKEND forces one. Selectors lxml can't take (pseudo-classes and
+other exotic syntax) fall through to the BeautifulSoup backends.
+
+    python fastparse.py bench [CORPUS_DIR] [--selector h2] [--repeat 3]
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+
+try:
+    from selectolax.parser import HTMLParser as _Selectolax
+except ImportError:
+    _Selectolax = None
+
+try:
+    import lxml.html as _lxml_html
+except ImportError:
+    _lxml_html = None
+
+try:
+    from bs4 import BeautifulSoup, SoupStrainer
+except ImportError:
+    BeautifulSoup = SoupStrainer = None
+
+class UnsupportedSelector(ValueError):
+    pass
+
+
+_COMPOUND_RE = re.compile(r"(?P<tag>\*|[a-zA-Z][\w-]*)?(?P<rest>(?:[.#][\w-]+|\[[^\]]+\])*)$")
+# Text inside these is code, not content; BeautifulSoup's get_text skips it
+# too unless the element itself is one of them.
+_RAW_TEXT_TAGS = ("script", "style", "template")
+_VISIBLE_TEXT = ".//text()[not(ancestor::script or ancestor::style or ancestor::template)]"
+_PART_RE = re.compile(r"\.([\w-]+)|#([\w-]+)|\[\s*([\w-]+)\s*(?:([~^$*|]?=)\s*(?:\"([^\"]*)\"|'([^']*)'|([^\]\s]*)))?\s*\]")
+
+
+def _split_compounds(group):
+    # "div.a > h2  span" -> ["div.a", ">", "h2", " ", "span"]
+    tokens = re.sub(r"\s*>\s*", " > ", group.strip()).split()
+    out = []
+    for tok in tokens:
+        if tok == ">":
+            out.append(">")
+        else:
+            if out and out[-1] != ">":
+                out.append(" ")
+            out.append(tok)
+    return out
+
+
+def _compound_xpath(compound):
+    m = _COMPOUND_RE.match(compound)
+    if not m:
+        raise UnsupportedSelector(compound)
+    preds = []
+    for cls, ident, attr, op, dq, sq, bare in _PART_RE.findall(m.group("rest")):
+        if cls:
+            preds.append(f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')")
+        elif ident:
+            preds.append(f"@id='{ident}'")
+        else:
+            attr = attr.lower()
+            value = dq or sq or bare
+            if "'" in value:
+                raise UnsupportedSelector(compound)
+            preds.append({
+                "": f"@{attr}",
+                "=": f"@{attr}='{value}'",
+                "~=": f"contains(concat(' ', normalize-space(@{attr}), ' '), ' {value} ')",
+                "^=": f"starts-with(@{attr}, '{value}')",
+                "*=": f"contains(@{attr}, '{value}')",
+            }.get(op) or _unsupported(compound))
+    # lxml.html lowercases tag and attribute names, and CSS matches them
+    # case-insensitively in HTML documents.
+    return (m.group("tag") or "*").lower() + "".join(f"[{p}]" for p in preds)
+
+
+def _unsupported(what):
+    raise UnsupportedSelector(what)
+
+
+def css_to_xpath(selector):
+    """Translate the common CSS subset (type, .class, #id, [attr], [attr=v],
+    ~= ^= *=, descendant and child combinators, comma groups) to XPath."""
+    paths = []
+    for group in selector.split(","):
+        if not group.strip():
+            raise UnsupportedSelector(selector)
+        xpath = "."
+        for tok in _split_compounds(group):
+            if tok == " ":
+                continue
+            if tok == ">":
+                xpath += "/"
+                continue
+            xpath += ("" if xpath.endswith("/") else "//") + _compound_xpath(tok)
+        paths.append(xpath)
+    return " | ".join(paths)
+
+
+def strainer_tags(selector):
+    """Tag names to restrict parsing to, or None if the selector needs the
+    surrounding tree (combinators, or a group without a type selector)."""
+    tags = []
+    for group in selector.split(","):
+        parts = _split_compounds(group)
+        m = _COMPOUND_RE.match(parts[0]) if len(parts) == 1 else None
+        if not m or not m.group("tag") or m.group("tag") == "*":
+            return None
+        tags.append(m.group("tag").lower())
+    return tags
+
+
+def _text_selectolax(html, selector):
+    return [node.text(deep=True, separator="", strip=True) for node in _Selectolax(html).css(selector)]
+
+
+def _text_lxml(html, selector):
+    xpath = css_to_xpath(selector)
+    try:
+        root = _lxml_html.document_fromstring(html)
+    except _lxml_html.etree.ParserError:  # nothing but whitespace or comments
+        return []
+    except ValueError:  # str input carrying an XML encoding declaration
+        root = _lxml_html.document_fromstring(html.encode("utf-8"))
+    return ["".join(t.strip() for t in (el.itertext() if el.tag in _RAW_TEXT_TAGS else el.xpath(_VISIBLE_TEXT)))
+            for el in root.xpath(xpath)]
+
+
+def _soup_builder():
+    return "lxml" if _lxml_html is not None else "html.parser"
+
+
+def _text_strainer(html, selector):
+    tags = strainer_tags(selector)
+    if tags is None:
+        soup = BeautifulSoup(html, _soup_builder())
+    else:
+        soup = BeautifulSoup(html, _soup_builder(), parse_only=SoupStrainer(tags))
+    return [el.get_text(strip=True) for el in soup.select(selector)]
+
+
+def _text_html_parser(html, selector):
+    soup = BeautifulSoup(html, "html.parser")
+    return [el.get_text(strip=True) for el in soup.select(selector)]
+
+
+BACKENDS = {
+    "selectolax": (_text_selectolax, _Selectolax is not None),
+    "lxml": (_text_lxml, _lxml_html is not None),
+    "strainer": (_text_strainer, BeautifulSoup is not None),
+    "html.parser": (_text_html_parser, BeautifulSoup is not None),
+}
+
+
+def available():
+    return [name for name, (_, ok) in BACKENDS.items() if ok]
+
+
+def select_text(html, selector, backend=None):
+    """Stripped text of each element matching ``selector``, in document order."""
+    names = [backend] if backend else available()
+    forced = os.getenv("FASTPARSE_BACKEND")
+    if forced and not backend:
+        names = [forced] + [n for n in names if n != forced]
+    for name in names:
+        fn, ok = BACKENDS[name]
+        if not ok:
+            continue
+        try:
+            return fn(html, selector)
+        except UnsupportedSelector:
+            if backend:
+                raise
+    raise RuntimeError("no HTML parser installed (need selectolax, lxml or beautifulsoup4)")
+
+
+def synthetic_corpus(pages=20, seed=3):
+    """Stand-in news front pages for machines without a saved corpus."""
+    import random
+    rng = random.Random(seed)
+    words = "storm coast election market inflation rally court ruling minister vaccine chip launch talks".split()
+    corpus = []
+    for p in range(pages):
+        parts = ["<!DOCTYPE html><html><head><title>front</title><script>var x = 1;</script></head><body>"]
+        for i in range(rng.randint(150, 400)):
+            headline = " ".join(rng.choices(words, k=rng.randint(4, 10))).capitalize()
+            # The odd headline carries tracking code or legacy upper-case
+            # markup, which every backend must read the same way.
+            if i % 13 == 0:
+                headline += f"<script>track({i})</script><style>.h{i}{{color:red}}</style>"
+            tag = "H2" if i % 17 == 0 else "h2"
+            parts.append(f'<article class="card story-{i % 7}"><a href="/s/{p}/{i}"><{tag} data-testid="card-headline">'
+                         f'{headline}</{tag}></a><p class="summary">{"lorem ipsum " * rng.randint(5, 30)}</p>'
+                         f'<ul class="tags"><li>{rng.choice(words)}</li><li>{rng.choice(words)}</li></ul></article>')
+        parts.append("</body></html>")
+        corpus.append((f"synthetic-{p}.html", "".join(parts)))
+    return corpus
+
+
+def load_corpus(directory):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, "**", "*.htm*"), recursive=True)):
+        with open(path, "rb") as f:
+            pages.append((os.path.relpath(path, directory), f.read().decode("utf-8", errors="replace")))
+    return pages
+
+
+def _child(backend, corpus_dir, selector, repeat):
+    # One backend per process, so max RSS covers C-side trees (lxml,
+    # selectolax) that tracemalloc cannot see.
+    import resource
+    pages = load_corpus(corpus_dir) if corpus_dir else synthetic_corpus()
+    fn = BACKENDS[backend][0]
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    best, out = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = [fn(html, selector) for _, html in pages]
+        el = time.perf_counter() - t0
+        best = el if best is None else min(best, el)
+    tracemalloc.start()
+    for _, html in pages:
+        fn(html, selector)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base_rss
+    digest = hashlib.sha1(json.dumps(out).encode("utf-8")).hexdigest()
+    print(json.dumps({"seconds": best, "py_peak": peak, "rss_growth_kb": rss, "matches": sum(map(len, out)),
+                      "digest": digest, "pages": len(pages), "bytes": sum(len(h) for _, h in pages)}))
+
+
+def bench(corpus_dir=None, selector="h2", repeat=3):
+    source = corpus_dir or "synthetic corpus"
+    print(f"selector {selector!r} over {source}")
+    print(f"{'backend':<12} {'time s':>8} {'MB/s':>7} {'py peak MB':>11} {'rss +MB':>8} {'matches':>8}  same as html.parser")
+    rows, reference = {}, None
+    for name in reversed(available()):
+        cmd = [sys.executable, os.path.abspath(__file__), "_child", name, corpus_dir or "", selector, str(repeat)]
+        p = subprocess.run(cmd, capture_output=True, text=True)
+        if p.returncode:
+            print(f"{name:<12} failed: {p.stderr.strip().splitlines()[-1]}")
+            continue
+        r = rows[name] = json.loads(p.stdout)
+        reference = reference or r["digest"]
+        print(f"{name:<12} {r['seconds']:>8.3f} {r['bytes'] / r['seconds'] / 2**20:>7.1f} "
+              f"{r['py_peak'] / 2**20:>11.1f} {r['rss_growth_kb'] / 1024:>8.1f} {r['matches']:>8}  "
+              f"{'yes' if r['digest'] == reference else 'NO'}")
+    return rows
+
+
+def main():
+    if sys.argv[1:2] == ["_child"]:
+        backend, corpus_dir, selector, repeat = sys.argv[2:6]
+        return _child(backend, corpus_dir or None, selector, int(repeat))
+    ap = argparse.ArgumentParser(description="Parse benchmark per HTML backend.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("bench", help="time and memory per backend over saved pages")
+    b.add_argument("corpus", nargs="?", help="directory of saved .html pages (default: synthetic pages)")
+    b.add_argument("--selector", default="h2")
+    b.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+    bench(args.corpus, args.selector, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Offline public-suffix index shared by the URL threat detectors.
+
+The bundled public_suffix_list.dat is compiled once into three hash sets
+(plain rules, wildcard parents, exceptions) and cached next to it as a
+marshal file (keyed on the list's SHA-1), which loads in a few milliseconds
+at import time. Lookups
+never touch the network and cost one set probe per hostname label.
+
+    python psl_index.py build [public_suffix_list.dat]   # refresh the cache
+"""
+import hashlib
+import ipaddress
+import marshal
+import os
+import sys
+import time
+from collections import namedtuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DAT = os.environ.get("PSL_FILE", os.path.join(HERE, "public_suffix_list.dat"))
+FORMAT = 1
+
+ExtractResult = namedtuple("ExtractResult", "subdomain domain suffix")
+
+
+def _forms(rule):
+    # Rules are listed in Unicode; hostnames usually arrive as punycode.
+    yield rule
+    try:
+        ascii_rule = rule.encode("idna").decode("ascii")
+    except UnicodeError:
+        return
+    if ascii_rule != rule:
+        yield ascii_rule
+
+
+def parse(lines, private=False):
+    rules, wildcards, exceptions = set(), set(), set()
+    for line in lines:
+        line = line.strip()
+        if "===BEGIN PRIVATE DOMAINS===" in line and not private:
+            break
+        if not line or line.startswith("//"):
+            continue
+        rule = line.split()[0].lower()
+        if rule.startswith("!"):
+            target, rule = exceptions, rule[1:]
+        elif rule.startswith("*."):
+            target, rule = wildcards, rule[2:]
+        else:
+            target = rules
+        target.update(_forms(rule))
+    return rules, wildcards, exceptions
+
+
+def _cache_path(dat):
+    return os.path.splitext(dat)[0] + ".idx"
+
+
+def _digest(dat):
+    with open(dat, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def build(dat=DAT):
+    with open(dat, encoding="utf-8") as f:
+        sets = parse(f)
+    data = (FORMAT, _digest(dat), [sorted(s) for s in sets])
+    tmp = _cache_path(dat) + ".tmp%d" % os.getpid()
+    with open(tmp, "wb") as f:
+        marshal.dump(data, f)
+    os.replace(tmp, _cache_path(dat))
+    return sets
+
+
+def load(dat=DAT):
+    try:
+        with open(_cache_path(dat), "rb") as f:
+            fmt, stamp, sets = marshal.load(f)
+        if fmt == FORMAT and stamp == _digest(dat):
+            return tuple(frozenset(s) for s in sets)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    try:
+        sets = build(dat)
+    except OSError:
+        # Read-only install: compile in memory, skip the cache file.
+        with open(dat, encoding="utf-8") as f:
+            sets = parse(f)
+    return tuple(frozenset(s) for s in sets)
+
+
+RULES, WILDCARDS, EXCEPTIONS = load()
+
+
+def suffix_start(labels):
+    """Index of the first public-suffix label, or None if no rule matches."""
+    n = len(labels)
+    for i in range(n):
+        cand = ".".join(labels[i:])
+        if cand in EXCEPTIONS:
+            return i + 1
+        if cand in RULES:
+            return i
+        if i + 1 < n and ".".join(labels[i + 1:]) in WILDCARDS:
+            return i
+    return None
+
+
+def _is_ipv4(host):
+    try:
+        ipaddress.IPv4Address(host)
+        return True
+    except ValueError:
+        return False
+
+
+def extract(host):
+    # Matching is case-insensitive; the parts keep the caller's spelling.
+    host = host.strip().rstrip(".")
+    parts = host.split(".") if host else []
+    i = suffix_start(host.lower().split(".") if host else [])
+    if i is None:
+        if len(parts) == 4 and _is_ipv4(host):
+            return ExtractResult("", host, "")
+        return ExtractResult(".".join(parts[:-1]), parts[-1] if parts else "", "")
+    return ExtractResult(".".join(parts[:max(i - 1, 0)]), parts[i - 1] if i else "", ".".join(parts[i:]))
+
+
+def public_suffix(host):
+    return extract(host).suffix
+
+
+def tld(host):
+    """Last label of the public suffix of ``host`` ("" for bare suffixes, IPs
+    and unknown TLDs)."""
+    suffix = extract(host).suffix.lower()
+    if not suffix or host.strip().rstrip(".").lower() == suffix:
+        return ""
+    return suffix.rsplit(".", 1)[-1]
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] != ["build"]:
+        sys.exit(__doc__)
+    src = sys.argv[2] if len(sys.argv) > 2 else DAT
+    t0 = time.perf_counter()
+    r, w, e = build(src)
+    print(f"{_cache_path(src)}: {len(r)} rules, {len(w)} wildcards, {len(e)} exceptions "
+          f"in {time.perf_counter() - t0:.3f}s")
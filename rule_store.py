@@ -0,0 +1,258 @@
+"""Memory-mapped threat-intel rule store.
+
+A rules file holds named sections in a compact binary layout:
+
+    header     "URS1", version, section count
+    directory  name, kind, offset, count, size   (one entry per section)
+    HASH       open-addressed table of 64-bit key hashes (0 = empty slot)
+    LIST/MAP   newline separated UTF-8 blob ("key\\tvalue" lines for MAP)
+
+HASH sections are probed straight out of the mapping, so a lookup costs one
+hash of the key plus a couple of 8-byte reads no matter how many entries the
+list holds. Files are written to a temp name and swapped in with
+os.replace(), and RuleStore picks the new file up without a restart.
+"""
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+
+MAGIC = b"URS1"
+VERSION = 1
+HASH, LIST, MAP = 1, 2, 3
+KINDS = {"hash": HASH, "list": LIST, "map": MAP}
+
+_HEADER = struct.Struct("<4sII")
+_ENTRY = struct.Struct("<16sIQQQ")
+_SLOT = struct.Struct("<Q")
+
+log = logging.getLogger(__name__)
+
+
+def key_hash(key):
+    h = int.from_bytes(hashlib.blake2b(key.encode("utf-8", "surrogatepass"), digest_size=8).digest(), "little")
+    return h or 1
+
+
+class HashIndex:
+    def __init__(self, buf, offset, count, slots):
+        self.buf, self.offset, self.count, self.mask = buf, offset, count, slots - 1
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, key):
+        h = key_hash(key)
+        i = h & self.mask
+        while True:
+            v = _SLOT.unpack_from(self.buf, self.offset + 8 * i)[0]
+            if v == h:
+                return True
+            if v == 0:
+                return False
+            i = (i + 1) & self.mask
+
+    def domain_match(self, host):
+        """True if ``host`` or any parent domain of it is in the index."""
+        i = 0
+        while True:
+            if host[i:] in self:
+                return True
+            i = host.find(".", i) + 1
+            if i == 0:
+                return False
+
+
+def _pack_hash(items):
+    keys = {key_hash(k) for k in items}
+    slots = 8
+    while slots < len(keys) * 2:
+        slots *= 2
+    table = [0] * slots
+    mask = slots - 1
+    for h in keys:
+        i = h & mask
+        while table[i]:
+            i = (i + 1) & mask
+        table[i] = h
+    return struct.pack("<%dQ" % slots, *table), len(keys), slots
+
+
+def pack(sections):
+    """Serialize ``{name: (kind, items)}`` into the rules file format."""
+    blobs = []
+    for name, (kind, items) in sections.items():
+        if isinstance(kind, str):
+            kind = KINDS[kind]
+        if kind == HASH:
+            blob, count, size = _pack_hash(str(i) for i in items)
+        else:
+            lines = [f"{k}\t{v}" for k, v in dict(items).items()] if kind == MAP else [str(i) for i in items]
+            blob = "\n".join(lines).encode("utf-8")
+            count, size = len(lines), len(blob)
+        blobs.append((name, kind, blob, count, size))
+
+    offset = _HEADER.size + _ENTRY.size * len(blobs)
+    head = [_HEADER.pack(MAGIC, VERSION, len(blobs))]
+    for name, kind, blob, count, size in blobs:
+        offset += -offset % 8
+        head.append(_ENTRY.pack(name.encode("ascii"), kind, offset, count, size))
+        offset += len(blob)
+
+    out = bytearray(b"".join(head))
+    for _, _, blob, _, _ in blobs:
+        out += b"\0" * (-len(out) % 8)
+        out += blob
+    return bytes(out)
+
+
+def build(path, sections):
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(pack(sections))
+    os.replace(tmp, path)
+
+
+def _sections(buf):
+    magic, version, n = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a rules file (version %d)" % version)
+    if _HEADER.size + n * _ENTRY.size > len(buf):
+        raise ValueError("truncated section directory")
+    out = {}
+    for i in range(n):
+        name, kind, offset, count, size = _ENTRY.unpack_from(buf, _HEADER.size + i * _ENTRY.size)
+        name = name.rstrip(b"\0").decode("ascii")
+        if kind == HASH:
+            if not size or size & (size - 1) or offset % 8:
+                raise ValueError("bad hash section %r" % name)
+            nbytes = 8 * size
+        elif kind in (LIST, MAP):
+            nbytes = size
+        else:
+            raise ValueError("unknown kind %d for section %r" % (kind, name))
+        if offset + nbytes > len(buf):
+            raise ValueError("section %r runs past end of file" % name)
+        out[name] = (kind, offset, count, size)
+    return out
+
+
+class RuleSet:
+    """Read-only view of one rules file; sections it lacks fall back to
+    ``defaults`` ({name: (kind, items)})."""
+
+    def __init__(self, buf=None, defaults=None):
+        self._views = {}
+        for source in (pack(defaults or {}), buf):
+            if source is None:
+                continue
+            for name, (kind, offset, count, size) in _sections(source).items():
+                self._views[name] = (source, kind, offset, count, size)
+
+    def __contains__(self, name):
+        return name in self._views
+
+    def hashset(self, name):
+        buf, kind, offset, count, size = self._views[name]
+        assert kind == HASH, name
+        return HashIndex(buf, offset, count, size)
+
+    def strings(self, name):
+        buf, kind, offset, count, size = self._views[name]
+        assert kind == LIST, name
+        blob = bytes(buf[offset:offset + size]).decode("utf-8")
+        return blob.split("\n") if count else []
+
+    def mapping(self, name):
+        buf, kind, offset, count, size = self._views[name]
+        assert kind == MAP, name
+        blob = bytes(buf[offset:offset + size]).decode("utf-8")
+        return dict(line.split("\t", 1) for line in blob.split("\n")) if count else {}
+
+
+def load(path, defaults=None):
+    with open(path, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return RuleSet(buf, defaults)
+
+
+class RuleStore:
+    """Keeps the current compiled rule snapshot and swaps in a new one when
+    the rules file changes.
+
+    Readers take ``store.rules`` once per evaluation and keep using that
+    object, so a reload never blocks or alters a scan already in progress;
+    the old mapping is released once the last reader drops it.
+    """
+
+    def __init__(self, path, defaults, compile=lambda rs: rs, interval=2.0):
+        self.path, self.defaults, self.compile = path, defaults, compile
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._stamp = None
+        self.rules = self.compile(RuleSet(None, defaults))
+        self.reload()
+        if interval:
+            t = threading.Thread(target=self._watch, args=(interval,), daemon=True)
+            t.start()
+
+    def on_reload(self, fn):
+        self._listeners.append(fn)
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def reload(self):
+        with self._lock:
+            stamp = self._file_stamp()
+            if stamp == self._stamp:
+                return False
+            try:
+                rs = load(self.path, self.defaults) if stamp else RuleSet(None, self.defaults)
+                rules = self.compile(rs)
+            except (OSError, ValueError, struct.error) as e:
+                # Remember the bad file so the watcher warns once per change.
+                self._stamp = stamp
+                log.warning("keeping previous rules, could not load %s: %s", self.path, e)
+                return False
+            self.rules, self._stamp = rules, stamp
+        for fn in self._listeners:
+            fn()
+        return True
+
+    def _watch(self, interval):
+        while True:
+            time.sleep(interval)
+            self.reload()
+
+
+def _read_list(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip().lower() for line in f if line.strip() and not line.startswith("#")]
+
+
+if __name__ == "__main__":
+    # python rule_store.py OUT.bin name=kind:file.txt [...]
+    #   e.g. rules.bin blocklist=hash:domains.txt shorteners=hash:short.txt
+    if len(sys.argv) < 3:
+        sys.exit(__doc__ + "\nusage: rule_store.py OUT.bin name=kind:file [...]")
+    spec = {}
+    for arg in sys.argv[2:]:
+        name, rest = arg.split("=", 1)
+        kind, src = rest.split(":", 1)
+        items = _read_list(src)
+        if kind == "map":
+            items = [line.split(None, 1) for line in items]
+        spec[name] = (kind, items)
+    t0 = time.perf_counter()
+    build(sys.argv[1], spec)
+    print(f"wrote {sys.argv[1]}: {', '.join(f'{n}={len(i)}' for n, (_, i) in spec.items())} "
+          f"in {time.perf_counter() - t0:.2f}s")
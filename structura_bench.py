@@ -0,0 +1,312 @@
+"""Benchmarks for Structura against a local stub HTTP server.
+
+    python structura_bench.py fetch [--sites 40 --delay 0.2]
+    python structura_bench.py parse [--mb 1 5]
+    python structura_bench.py revalidate [--sites 40 --mb 2]
+    python structura_bench.py chat [--requests 200 --questions 20 --delay 0.5]
+    python structura_bench.py startup [--repeat 5 --top 8]
+
+The stub serves synthetic product pages (size and latency set per request
+through the query string) over keep-alive HTTP/1.1 on 127.0.0.1, so every
+benchmark runs offline and is repeatable. The chat benchmark swaps Gemini
+for Structura's FakeModel.
+"""
+import argparse
+import random
+import hashlib
+import importlib.util
+import os
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+import tempfile
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_structura():
+    os.environ.setdefault("STRUCTURA_CACHE_DB", os.path.join(tempfile.mkdtemp(), "bench_cache.sqlite3"))
+    sys.path.insert(0, HERE)
+    spec = importlib.util.spec_from_file_location("structura", os.path.join(HERE, "Structura.py"))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def synthetic_page(links=120, forms=3, inputs=20, buttons=15, filler=0):
+    parts = ["<!DOCTYPE html><html><head><title>stub</title></head><body><nav>"]
+    parts += [f'<a href="/p/{i}">Item {i}</a>' for i in range(links)]
+    parts.append("</nav><main>")
+    for f in range(forms):
+        parts.append(f'<form action="/f/{f}">')
+        parts += [f'<input name="i{f}_{i}">' for i in range(inputs // max(forms, 1))]
+        parts.append("</form>")
+    parts += [f"<button>b{i}</button>" for i in range(buttons)]
+    parts += ["<p>" + "lorem ipsum dolor sit amet " * 20 + "</p>"] * filler
+    parts.append("</main></body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    pages = {}
+    last_modified = formatdate(time.time() - 3600, usegmt=True)
+
+    def do_GET(self):
+        q = {k: int(float(v[0]) * 1000) if k == "delay" else int(v[0])
+             for k, v in parse_qs(urlparse(self.path).query).items()}
+        delay = q.pop("delay", 0) / 1000
+        key = tuple(sorted(q.items()))
+        body = self.pages.get(key)
+        if body is None:
+            body = self.pages[key] = synthetic_page(**q)
+        if delay:
+            time.sleep(delay)
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", self.last_modified)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer:
+    def __init__(self, host="127.0.0.1"):
+        self.httpd = ThreadingHTTPServer((host, 0), StubHandler)
+        self.httpd.daemon_threads = True
+        self.base = f"http://{host}:{self.httpd.server_port}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def url(self, path="/", **params):
+        return f"{self.base}{path}?" + "&".join(f"{k}={v}" for k, v in params.items())
+
+    def close(self):
+        self.httpd.shutdown()
+
+
+def bench_fetch(args):
+    s = load_structura()
+    # Distinct loopback addresses act as distinct hosts for the per-host limit.
+    servers = [StubServer(f"127.0.0.{i + 1}") for i in range(args.hosts)]
+    # Separate paths per pass so the second pass is not served by revalidation.
+    urls = lambda run: [servers[i % len(servers)].url(f"/{run}/{i}", delay=args.delay, links=80 + i % 40)
+                        for i in range(args.sites)]
+    try:
+        t0 = time.perf_counter()
+        serial = [s.analyze_site(u) for u in urls("serial")]
+        t_serial = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        batch = s.analyze_many(urls("batch"))
+        t_batch = time.perf_counter() - t0
+    finally:
+        for srv in servers:
+            srv.close()
+
+    assert [tuple(r[:2]) for r in serial] == [(b["score"], b["status"]) for b in batch]
+    print(f"{args.sites} sites on {args.hosts} hosts, {args.delay * 1000:.0f} ms server latency")
+    print(f"serial analyze_site : {t_serial:7.2f}s  ({args.sites / t_serial:6.1f} sites/s)")
+    print(f"analyze_many        : {t_batch:7.2f}s  ({args.sites / t_batch:6.1f} sites/s)  "
+          f"{t_serial / t_batch:.1f}x faster")
+
+
+def bs4_counts(html):
+    # The pre-streaming implementation: full tree, then four find_all walks.
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    return {t: len(soup.find_all(t)) for t in ("a", "form", "input", "button")}
+
+
+def measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    out = fn()
+    el = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return out, el, peak
+
+
+def bench_parse(args):
+    s = load_structura()
+    print(f"{'page MB':>8} {'bs4 s':>8} {'bs4 peak MB':>12} {'stream s':>9} {'stream peak MB':>15} {'speedup':>8}")
+    for mb in args.mb:
+        unit = synthetic_page(links=200, forms=6, inputs=30, buttons=20, filler=10)
+        html = (unit * max(1, int(mb * 1024 * 1024 / len(unit)))).decode("utf-8")
+        chunks = lambda: (html[i:i + s.CHUNK_SIZE] for i in range(0, len(html), s.CHUNK_SIZE))
+
+        old, t_old, m_old = measure(lambda: bs4_counts(html))
+        new, t_new, m_new = measure(lambda: s.count_tags(chunks()))
+        assert old == new, (old, new)
+        assert s.score_counts(old) == s.score_counts(new)
+        print(f"{len(html) / 2**20:>8.1f} {t_old:>8.2f} {m_old / 2**20:>12.1f} {t_new:>9.2f} "
+              f"{m_new / 2**20:>15.1f} {t_old / t_new:>7.1f}x")
+
+
+def bench_revalidate(args):
+    s = load_structura()
+    srv = StubServer()
+    filler = max(0, int(args.mb * 1024 * 1024 / 550))
+    urls = [srv.url(f"/rv/{i}", links=100 + i, filler=filler) for i in range(args.sites)]
+    try:
+        t0 = time.perf_counter()
+        cold = [s.analyze_site(u) for u in urls]
+        t_cold = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        warm = [s.analyze_site(u) for u in urls]
+        t_warm = time.perf_counter() - t0
+    finally:
+        srv.close()
+
+    assert cold == warm
+    print(f"{args.sites} pages of ~{args.mb} MB")
+    print(f"first pass (200 + parse) : {t_cold:7.2f}s")
+    print(f"second pass (304)        : {t_warm:7.2f}s  {t_cold / t_warm:.1f}x faster")
+    print(s.analysis_cache.metrics())
+
+
+def bench_chat(args):
+    os.environ["STRUCTURA_FAKE_LLM"] = "1"
+    os.environ["STRUCTURA_FAKE_LLM_DELAY"] = str(args.delay)
+    s = load_structura()
+    rng = random.Random(7)
+    analysis = {"score": 58, "status": "Overextended", "signals": ["Navigation surface is dense"]}
+    base = [f"why is question {i} a problem" for i in range(args.questions)]
+    # Same questions with different casing and punctuation hit the same entry.
+    asks = [rng.choice([q, q.upper(), q + "?", "  " + q.title() + "!"]) for q in rng.choices(base, k=args.requests)]
+
+    lat, lock, counter = [], threading.Lock(), iter(asks)
+
+    def worker():
+        c = s.app.test_client()
+        while True:
+            with lock:
+                msg = next(counter, None)
+            if msg is None:
+                return
+            t = time.perf_counter()
+            d = c.post("/chat", json={"msg": msg, "analysis": analysis}).get_json()
+            while "reply" not in d:
+                time.sleep(0.02)
+                d = c.get(d["poll"]).get_json()
+            with lock:
+                lat.append(time.perf_counter() - t)
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(args.clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    lat.sort()
+    print(f"{args.requests} asks ({args.questions} distinct) from {args.clients} clients, "
+          f"{args.delay * 1000:.0f} ms model latency")
+    print(f"model calls {s.get_model().calls}  (uncached: {args.requests})")
+    print(f"wall {wall:.2f}s vs {args.requests * args.delay / args.clients:.2f}s uncached at this concurrency")
+    print(f"p50 {lat[len(lat) // 2] * 1000:.1f} ms  p95 {lat[int(len(lat) * .95)] * 1000:.1f} ms")
+    print(s.marin.metrics())
+
+
+STARTUP_CHILD = """
+import importlib.util, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {here!r})
+spec = importlib.util.spec_from_file_location("structura", {path!r})
+mod = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(mod)
+if {eager}:
+    mod.get_model()
+print(time.perf_counter() - t0)
+"""
+
+
+def import_profile(eager):
+    """Import Structura in a fresh interpreter under -X importtime. Returns
+    (seconds, {top-level module: cumulative us})."""
+    env = dict(os.environ, STRUCTURA_CACHE_DB=os.path.join(tempfile.mkdtemp(), "startup.sqlite3"))
+    env.pop("STRUCTURA_FAKE_LLM", None)
+    if eager:
+        env.setdefault("GEMINI_API_KEY", "bench-placeholder")
+    code = STARTUP_CHILD.format(here=HERE, path=os.path.join(HERE, "Structura.py"), eager=eager)
+    p = subprocess.run([sys.executable, "-X", "importtime", "-c", code], env=env, capture_output=True, text=True)
+    if p.returncode:
+        raise RuntimeError(p.stderr.strip().splitlines()[-1])
+    modules = {}
+    for line in p.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit() and not name[1:].startswith(" "):
+            modules[name.strip()] = int(cumulative)
+    return float(p.stdout.split()[-1]), modules
+
+
+def bench_startup(args):
+    # "eager" is what every worker paid before the model became lazy: the
+    # google.generativeai import plus configure/GenerativeModel at load.
+    runs = {}
+    for label, eager in (("lazy import", False), ("eager model", True)):
+        try:
+            samples = [import_profile(eager) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"{label}: skipped ({e})")
+            continue
+        best = min(samples, key=lambda s: s[0])
+        runs[label] = best
+        print(f"{label:<12} best of {args.repeat}: {best[0] * 1000:7.1f} ms")
+        for name, us in sorted(best[1].items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"    {name:<32} {us / 1000:7.1f} ms")
+    if len(runs) == 2:
+        lazy, eager = runs["lazy import"][0], runs["eager model"][0]
+        print(f"cold start saved: {(eager - lazy) * 1000:.1f} ms ({eager / lazy:.1f}x)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    f = sub.add_parser("fetch", help="serial analyze_site vs concurrent analyze_many")
+    f.add_argument("--sites", type=int, default=40)
+    f.add_argument("--hosts", type=int, default=4)
+    f.add_argument("--delay", type=float, default=0.2, help="stub server latency in seconds")
+    f.set_defaults(fn=bench_fetch)
+    p = sub.add_parser("parse", help="BeautifulSoup tree walks vs the streaming metrics pass")
+    p.add_argument("--mb", type=float, nargs="+", default=[1, 5], help="page sizes in MB")
+    p.set_defaults(fn=bench_parse)
+    r = sub.add_parser("revalidate", help="cold analysis vs conditional-GET revalidation")
+    r.add_argument("--sites", type=int, default=40)
+    r.add_argument("--mb", type=float, default=2, help="approximate page size in MB")
+    r.set_defaults(fn=bench_revalidate)
+    c = sub.add_parser("chat", help="Marin reply cache and request coalescing against FakeModel")
+    c.add_argument("--requests", type=int, default=200)
+    c.add_argument("--questions", type=int, default=20, help="distinct questions in the mix")
+    c.add_argument("--clients", type=int, default=8)
+    c.add_argument("--delay", type=float, default=0.5, help="fake model latency in seconds")
+    c.set_defaults(fn=bench_chat)
+    st = sub.add_parser("startup", help="-X importtime cold start with and without eager model setup")
+    st.add_argument("--repeat", type=int, default=5)
+    st.add_argument("--top", type=int, default=8, help="top-level imports to list")
+    st.set_defaults(fn=bench_startup)
+    args = ap.parse_args()
+    args.fn(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""Latency and throughput benchmark for the URL Threat Detector web app.
+
+Drives "URL Threat Detector WB.py" in-process through Flask's test client
+and over HTTP against a local threaded WSGI server, using a seeded
+synthetic URL corpus. Reports p50/p95/p99 latency and throughput per
+endpoint plus a per-rule cost breakdown of heuristic_score, and saves
+everything as JSON so runs can be compared across releases.
+
+    python threat_bench.py --urls 5000 --requests 500 --out bench_results/
+"""
+import argparse
+import http.client
+import importlib.util
+import json
+import logging
+import os
+import platform
+import random
+import string
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP_FILE = os.path.join(HERE, "URL Threat Detector WB.py")
+
+
+def load_app(path=APP_FILE):
+    sys.path.insert(0, os.path.dirname(path))
+    spec = importlib.util.spec_from_file_location("threat_detector", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def synthetic_corpus(n, seed=42):
+    rng = random.Random(seed)
+    word = lambda a=3, b=10: "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(a, b)))
+    benign = ["google.com", "github.com", "wikipedia.org", "bbc.co.uk", "amazon.com", "cdn.jsdelivr.net",
+              "login.microsoftonline.com", "accounts.google.com", "news.ycombinator.com"]
+    makers = [
+        (40, lambda: f"https://{rng.choice(benign)}/{word()}/{word()}"),
+        (10, lambda: f"https://{rng.choice(benign)}/search?q={word()}&session={word(16, 32)}"),
+        (8, lambda: f"http://{rng.choice(['bit.ly', 't.co', 'rb.gy', 'cutt.ly'])}/{word(5, 8)}"),
+        (8, lambda: f"http://{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+                    f":{rng.choice([80, 8080, 8888, 22])}/{word()}"),
+        (8, lambda: f"http://{word()}-{word()}.{rng.choice(['tk', 'ml', 'gq', 'zip', 'xyz'])}/download/{word()}.exe"),
+        (6, lambda: f"https://xn--{word(6, 12)}.com/login?redirect=https%3A%2F%2F{word()}.com"),
+        (6, lambda: f"https://{'.'.join(word(2, 6) for _ in range(rng.randint(4, 7)))}.com/{word()}"),
+        (5, lambda: f"https://аpple-{word()}.com/verify?token={word(20, 40)}&email={word()}%40mail.com"),
+        (5, lambda: f"https://{word(20, 40)}{rng.randint(1000, 99999)}.net/{word()}%252F..//{word()}"),
+        (4, lambda: f"http://{word()}.com/?q=<script>alert(1)</script>&{'x' * rng.randint(100, 200)}"),
+    ]
+    weights = [w for w, _ in makers]
+    return [rng.choices(makers, weights)[0][1]() for _ in range(n)]
+
+
+def percentiles(samples):
+    if not samples:
+        return {}
+    s = sorted(samples)
+    pick = lambda q: s[min(len(s) - 1, max(0, int(round(q * len(s) + 0.5)) - 1))]
+    return {"n": len(s), "mean_ms": sum(s) / len(s) * 1000, "p50_ms": pick(.50) * 1000,
+            "p95_ms": pick(.95) * 1000, "p99_ms": pick(.99) * 1000, "max_ms": s[-1] * 1000}
+
+
+def timed(fn, reps):
+    lat = []
+    t0 = time.perf_counter()
+    for i in range(reps):
+        t = time.perf_counter()
+        fn(i)
+        lat.append(time.perf_counter() - t)
+    wall = time.perf_counter() - t0
+    return dict(percentiles(lat), wall_s=wall, req_per_s=reps / wall if wall else None)
+
+
+def rule_table(m):
+    r = m.RULES.rules
+    return [
+        ("split_url", lambda u, p: m.split_url(u)),
+        ("http_scheme", lambda u, p: u.startswith("http://")),
+        ("ip_host", lambda u, p: m.IP_RE.match(p[0])),
+        ("test_domains", lambda u, p: r.test.search(p[0])),
+        ("blocklist", lambda u, p: m.is_blocklisted(p[0], r)),
+        ("public_suffix", lambda u, p: m.psl_index.extract(p[0]).suffix in r.rare_tlds),
+        ("label_count", lambda u, p: len(p[0].split(".")) >= 5),
+        ("at_sign", lambda u, p: "@" in u),
+        ("punycode", lambda u, p: "xn--" in p[0]),
+        ("port", lambda u, p: p[3] is not None and str(p[3]) in r.ports),
+        ("shortener", lambda u, p: m.is_shortener(p[0], r)),
+        ("entropy", lambda u, p: m.entropy(p[0])),
+        ("mixed_script", lambda u, p: m.mixed_script(p[0])),
+        ("homoglyph", lambda u, p: m.homoglyph_attack(p[0], r)),
+        ("params", lambda u, p: m.suspicious_params(p[2])),
+        ("bad_path", lambda u, p: m.bad_path(p[1])),
+        ("encoding", lambda u, p: m.ENCODING_RE.search(u)),
+        ("double_encoding", lambda u, p: m.DOUBLE_ENCODE_RE.search(u)),
+        ("javascript", lambda u, p: m.JS_RE.search(u)),
+        ("bad_ext", lambda u, p: r.ext.count(u.lower())),
+        ("format", lambda u, p: m.format_quality(u)),
+    ]
+
+
+def bench_rules(m, corpus, rounds=3):
+    parsed = []
+    for u in corpus:
+        try:
+            parsed.append((u, m.split_url(u)))
+        except ValueError:
+            pass
+    out = {}
+    for name, fn in rule_table(m):
+        best = None
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            for u, p in parsed:
+                fn(u, p)
+            el = time.perf_counter() - t0
+            best = el if best is None else min(best, el)
+        out[name] = best / len(parsed) * 1e9
+    t0 = time.perf_counter()
+    for u, _ in parsed:
+        m.heuristic_score(u)
+    out["heuristic_score_total"] = (time.perf_counter() - t0) / len(parsed) * 1e9
+    return {"ns_per_url": out, "urls": len(parsed)}
+
+
+def bench_test_client(m, corpus, reqs, batch_size):
+    c = m.app.test_client()
+    res = {}
+    res["GET /"] = timed(lambda i: c.get("/"), reqs)
+    res["POST /"] = timed(lambda i: c.post("/", data={"url": corpus[i % len(corpus)]}), reqs)
+    res["GET /about"] = timed(lambda i: c.get("/about"), reqs)
+
+    run = datetime.now().strftime("%H%M%S")
+    report = lambda i: c.get("/download_report", query_string={
+        "u": corpus[i % len(corpus)], "s": 50, "p": 46, "v": "Suspicious", "cid": f"B{run}{i}", "ts": "bench"})
+    res["GET /download_report (enqueue)"] = timed(report, reqs)
+    wait_reports(m, [f"B{run}{i}" for i in range(reqs)])
+    res["GET /download_report (cached)"] = timed(report, reqs)
+
+    batches = max(1, min(reqs, len(corpus) // batch_size))
+    body = lambda i: "\n".join(corpus[(i * batch_size + k) % len(corpus)] for k in range(batch_size))
+    r = timed(lambda i: c.post("/api/scan/batch", data=body(i)).get_data(), batches)
+    r["urls_per_s"] = batches * batch_size / r["wall_s"]
+    res[f"POST /api/scan/batch x{batch_size}"] = r
+    return res
+
+
+def wait_reports(m, cids, timeout=60):
+    m.REPORT_POOL.submit(lambda: None).result()
+    deadline = time.time() + timeout
+    while time.time() < deadline and any(m.report_state(cid) in ("queued", "running") for cid in cids):
+        time.sleep(0.05)
+
+
+def bench_server(m, corpus, reqs, concurrency, batch_size):
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    srv = make_server("127.0.0.1", 0, m.app, threaded=True)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    port = srv.server_port
+
+    def drive(method, path, body_fn=None, n=reqs, content_type="application/x-www-form-urlencoded"):
+        # path may be a function of the request index, like body_fn
+        lat, lock, counter = [], threading.Lock(), iter(range(n))
+
+        def worker():
+            while True:
+                with lock:
+                    i = next(counter, None)
+                if i is None:
+                    return
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                body = body_fn(i) if body_fn else None
+                headers = {"Content-Type": content_type} if body else {}
+                t = time.perf_counter()
+                conn.request(method, path(i) if callable(path) else path, body=body, headers=headers)
+                conn.getresponse().read()
+                el = time.perf_counter() - t
+                conn.close()
+                with lock:
+                    lat.append(el)
+
+        t0 = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - t0
+        return dict(percentiles(lat), wall_s=wall, req_per_s=n / wall, concurrency=concurrency)
+
+    from urllib.parse import urlencode
+    run = "S" + datetime.now().strftime("%H%M%S")
+    report = lambda i: "/download_report?" + urlencode({
+        "u": corpus[i % len(corpus)], "s": 50, "p": 46, "v": "Suspicious", "cid": f"{run}{i}", "ts": "bench"})
+    batches = max(1, min(reqs, len(corpus) // batch_size))
+    body = lambda i: "\n".join(corpus[(i * batch_size + k) % len(corpus)] for k in range(batch_size)).encode("utf-8")
+    try:
+        res = {
+            "GET /": drive("GET", "/"),
+            "POST /": drive("POST", "/", lambda i: urlencode({"url": corpus[i % len(corpus)]})),
+            "GET /about": drive("GET", "/about"),
+            "GET /download_report (enqueue)": drive("GET", report),
+        }
+        wait_reports(m, [f"{run}{i}" for i in range(reqs)])
+        res["GET /download_report (cached)"] = drive("GET", report)
+        r = res[f"POST /api/scan/batch x{batch_size}"] = drive("POST", "/api/scan/batch", body, n=batches,
+                                                               content_type="text/plain")
+        r["urls_per_s"] = batches * batch_size / r["wall_s"]
+        return res
+    finally:
+        srv.shutdown()
+
+
+def git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def print_section(title, rows):
+    print(f"\n== {title}")
+    for name, r in rows.items():
+        extra = f"  {r['urls_per_s']:,.0f} URLs/s" if "urls_per_s" in r else ""
+        print(f"{name:<36} p50 {r['p50_ms']:8.2f}ms  p95 {r['p95_ms']:8.2f}ms  p99 {r['p99_ms']:8.2f}ms"
+              f"  {r['req_per_s']:8.1f} req/s{extra}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--urls", type=int, default=2000, help="synthetic corpus size")
+    ap.add_argument("--requests", type=int, default=300, help="requests per endpoint")
+    ap.add_argument("--batch-size", type=int, default=500)
+    ap.add_argument("--concurrency", type=int, default=8, help="client threads against the WSGI server")
+    ap.add_argument("--warm-cache", action="store_true", help="keep the verdict cache enabled")
+    ap.add_argument("--skip-server", action="store_true")
+    ap.add_argument("--out", default="bench_results", help="JSON file or directory")
+    args = ap.parse_args()
+
+    m = load_app()
+    if not args.warm_cache:
+        m.VERDICT_CACHE.maxsize = 0
+    corpus = synthetic_corpus(args.urls)
+
+    results = {
+        "app": os.path.basename(APP_FILE), "git": git_rev(), "time": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+        "params": vars(args),
+        "rules": bench_rules(m, corpus),
+        "test_client": bench_test_client(m, corpus, args.requests, args.batch_size),
+    }
+    if not args.skip_server:
+        results["wsgi_server"] = bench_server(m, corpus, args.requests, args.concurrency, args.batch_size)
+
+    print("== heuristic_score rules (ns/URL)")
+    for name, ns in sorted(results["rules"]["ns_per_url"].items(), key=lambda kv: -kv[1]):
+        print(f"{name:<24} {ns:10.0f}")
+    print_section("in-process test client", results["test_client"])
+    if "wsgi_server" in results:
+        print_section(f"WSGI server, {args.concurrency} clients", results["wsgi_server"])
+
+    out = args.out
+    if not out.endswith(".json"):
+        os.makedirs(out, exist_ok=True)
+        out = os.path.join(out, f"threat_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nsaved {out}")
+
+
+if __name__ == "__main__":
+    main()
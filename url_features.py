@@ -0,0 +1,126 @@
+"""Vectorized hostname features for batch URL scoring.
+
+extract() turns a list of hostnames into NumPy arrays in a handful of array
+passes: every host is laid end to end as code points, tagged with its row,
+and the per-host counts come out of np.bincount / np.unique instead of a
+Python loop per character.
+
+    python url_features.py [N ...]   # benchmark against the per-URL path
+"""
+import math
+import random
+import string
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+CHUNK = 16384
+
+
+def _entropy(rows, counts, lengths, n):
+    p = counts / lengths[rows]
+    return -np.bincount(rows, weights=p * np.log2(p), minlength=n)
+
+
+def _chunk(hosts, glyphs, histogram):
+    n = len(hosts)
+    lengths = np.fromiter(map(len, hosts), dtype=np.int64, count=n)
+    cps = np.frombuffer("".join(hosts).encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+    row = np.repeat(np.arange(n), lengths)
+
+    if cps.size and cps.max() < 256:
+        # Latin-1 only: one dense bincount gives every per-host histogram.
+        hist = np.bincount(row * 256 + cps, minlength=n * 256).reshape(n, 256)
+        rows, cols = np.nonzero(hist)
+        ent = _entropy(rows, hist[rows, cols], lengths, n)
+    else:
+        keys, counts = np.unique((row << 21) | cps, return_counts=True)
+        ent = _entropy(keys >> 21, counts, lengths, n)
+
+    out = {
+        "length": lengths,
+        "labels": np.bincount(row, weights=cps == 46, minlength=n).astype(np.int64) + 1,
+        "digit_ratio": np.divide(np.bincount(row, weights=(cps >= 48) & (cps <= 57), minlength=n),
+                                 lengths, out=np.zeros(n), where=lengths > 0),
+        "non_ascii": np.bincount(row, weights=cps > 127, minlength=n).astype(np.int64),
+        "homoglyphs": np.bincount(row, weights=np.isin(cps, glyphs), minlength=n).astype(np.int64),
+        "entropy": ent,
+    }
+    if histogram:
+        # UTF-8 byte counts per host follow from the code points, so the byte
+        # buffer can be tagged with rows without encoding hosts one by one.
+        width = 1 + (cps >= 0x80) + (cps >= 0x800) + (cps >= 0x10000)
+        blen = np.bincount(row, weights=width, minlength=n).astype(np.int64)
+        data = np.frombuffer("".join(hosts).encode("utf-8", "surrogatepass"), dtype=np.uint8)
+        brow = np.repeat(np.arange(n), blen)
+        out["byte_hist"] = np.bincount(brow * 256 + data, minlength=n * 256).reshape(n, 256)
+    return out
+
+
+def extract(hosts, homoglyphs=(), histogram=False, chunk=CHUNK):
+    """Feature arrays for ``hosts``: length, labels, digit_ratio, non_ascii,
+    homoglyphs, entropy and, with ``histogram=True``, an (n, 256) byte_hist."""
+    hosts = list(hosts)
+    glyphs = np.array(sorted(ord(c) for c in homoglyphs), dtype=np.uint32)
+    parts = [_chunk(hosts[i:i + chunk], glyphs, histogram) for i in range(0, len(hosts), chunk)]
+    if not parts:
+        parts = [_chunk([], glyphs, histogram)]
+    return {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+
+def _entropy_per_char(s):
+    # The detector's original formulation: one str.count per distinct char.
+    if not s:
+        return 0
+    f = {c: s.count(c) for c in set(s)}
+    return -sum((f[c] / len(s)) * math.log2(f[c] / len(s)) for c in f)
+
+
+def _entropy_counter(s):
+    if not s:
+        return 0
+    n = len(s)
+    return -sum((c / n) * math.log2(c / n) for c in Counter(s).values())
+
+
+def _synthetic_hosts(n, seed=11):
+    rng = random.Random(seed)
+    alphabet = string.ascii_lowercase + string.digits + "-"
+    labels = [
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(3, 14))) for _ in range(5000)
+    ] + ["аpple", "gооgle", "pаypal"]
+    tlds = ["com", "net", "org", "tk", "xyz", "co.uk"]
+    return [".".join(rng.choice(labels) for _ in range(rng.randint(1, 4))) + "." + rng.choice(tlds)
+            for _ in range(n)]
+
+
+def benchmark(sizes=(10_000, 100_000, 1_000_000)):
+    glyphs = "аоесрхіԁԃԍ"
+    print(f"{'hosts':>9} {'per-char s':>11} {'counter s':>10} {'vector s':>9} {'speedup':>8}")
+    for n in sizes:
+        hosts = _synthetic_hosts(n)
+
+        t0 = time.perf_counter()
+        slow = [(_entropy_per_char(h), any(ord(c) > 127 for c in h), any(c in glyphs for c in h))
+                for h in hosts]
+        t_slow = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for h in hosts:
+            _entropy_counter(h), any(ord(c) > 127 for c in h), any(c in glyphs for c in h)
+        t_counter = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        x = extract(hosts, glyphs)
+        t_vec = time.perf_counter() - t0
+
+        assert np.allclose(x["entropy"], [s[0] for s in slow])
+        assert ((x["non_ascii"] > 0) == np.array([s[1] for s in slow])).all()
+        assert ((x["homoglyphs"] > 0) == np.array([s[2] for s in slow])).all()
+        print(f"{n:>9} {t_slow:>11.3f} {t_counter:>10.3f} {t_vec:>9.3f} {t_slow / t_vec:>7.1f}x")
+
+
+if __name__ == "__main__":
+    benchmark([int(a) for a in sys.argv[1:]] or (10_000, 100_000, 1_000_000))